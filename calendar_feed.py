@@ -0,0 +1,193 @@
+# calendar_feed.py
+
+import threading
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+from flask import current_app
+from sqlalchemy import func
+from models import db, Employee, PreviousSchedule
+from fairness import week_start_for
+from shifts import WEEK_DAYS, shift_window
+from versions import load_schedule
+
+PRODID = "-//iqos-scheduler//Shift feed//EN"
+
+
+def ics_escape(text):
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n"))
+
+
+def ics_datetime(day, hhmm, tz=None):
+    # Shift windows are wall-clock times in the store's zone. With a zone they are
+    # converted to UTC, so clients need no VTIMEZONE; without one they stay floating.
+    local = datetime.combine(day, datetime.strptime(hhmm, "%H:%M").time())
+    if tz is None:
+        return local.strftime("%Y%m%dT%H%M%S")
+    return local.replace(tzinfo=tz).astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def employee_week_entries(schedule, name_ids):
+    # Working shifts per employee id in one weekly schedule:
+    #   {employee_id: ((day, label, shift_type, is_morning), ...)}
+    # Every employee with an entry gets a key, even without working shifts. Entries
+    # saved before ids were recorded fall back to name_ids, which only holds
+    # unambiguous names.
+    entries = {}
+    for day in WEEK_DAYS:
+        for entry in schedule.get(day, []):
+            employee_id = entry.get("employee_id")
+            if employee_id is None:
+                employee_id = name_ids.get(entry["employee"])
+            if employee_id is None:
+                continue
+            shifts = entries.setdefault(employee_id, [])
+            if "Morning" in entry["shift"] or "Evening" in entry["shift"]:
+                shifts.append((day, entry["shift"], entry.get("shift_type"), "Morning" in entry["shift"]))
+    return {employee_id: tuple(shifts) for employee_id, shifts in entries.items()}
+
+
+def unique_employee_ids():
+    # name -> id for names held by exactly one employee.
+    ids = {}
+    for employee_id, name in db.session.query(Employee.id, Employee.name):
+        ids[name] = None if name in ids else employee_id
+    return {name: employee_id for name, employee_id in ids.items() if employee_id is not None}
+
+
+class FeedIndex:
+    """Employee id -> entries index over stored schedule versions.
+
+    The roster of a week is its most recent version. The index is refreshed
+    incrementally from versions newer than the last one seen, and an employee's
+    feed version only moves when their own entries change, so cached feeds stay
+    valid across regenerations that do not affect them. It is rebuilt from
+    scratch when the last version seen is gone or changed, e.g. after the
+    database was reset and SQLite reuses ids.
+
+    A version is filed under the week it was generated in (week_start_for of its
+    date), matching create_schedule, which always plans the current week. A roster
+    generated ahead of time for the next week would be shown a week early.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.last_version = (0, None)  # (id, date) of the newest version indexed
+        self.week_records = {}         # week_start -> PreviousSchedule id of the current roster
+        self.week_employees = {}       # week_start -> employee ids in that roster
+        self.entries = {}              # employee_id -> {week_start: entries}
+        self.employee_version = {}     # employee_id -> version id of their last change
+        self.sequences = {}            # employee_id -> {shift date: SEQUENCE of its event}
+        self.feeds = {}                # (employee_id, version, first_week, timezone, name) -> ics bytes
+
+    def is_stale(self):
+        # The newest version seen must still exist unchanged for the index to be valid.
+        last_id, last_date = self.last_version
+        if not last_id:
+            return False
+        record = db.session.get(PreviousSchedule, last_id)
+        return record is None or record.date != last_date
+
+    def refresh(self, since):
+        latest = db.session.query(func.max(PreviousSchedule.id)).scalar() or 0
+        if latest == self.last_version[0] and not self.is_stale():
+            return
+        with self.lock:
+            if latest < self.last_version[0] or self.is_stale():
+                self.reset()
+            records = (
+                PreviousSchedule.query
+                .filter(PreviousSchedule.id > self.last_version[0],
+                        PreviousSchedule.date >= datetime.combine(since, datetime.min.time()))
+                .order_by(PreviousSchedule.date, PreviousSchedule.id)
+                .all()
+            )
+            name_ids = unique_employee_ids() if records else {}
+            for record in records:
+                self.index_version(record, name_ids)
+            newest = db.session.get(PreviousSchedule, latest) if latest else None
+            self.last_version = (latest, newest.date if newest is not None else None)
+
+    def index_version(self, record, name_ids):
+        # Assumes the version is the roster of the week it was generated in.
+        week = week_start_for(record.date.date())
+        by_employee = employee_week_entries(load_schedule(record.id), name_ids)
+        affected = set(by_employee) | self.week_employees.get(week, set())
+        self.week_records[week] = record.id
+        self.week_employees[week] = set(by_employee)
+        for employee_id in affected:
+            entries = by_employee.get(employee_id, ())
+            weeks = self.entries.setdefault(employee_id, {})
+            previous = weeks.get(week)
+            if previous != entries:
+                if previous is not None:
+                    self.bump_sequences(employee_id, week, previous, entries)
+                weeks[week] = entries
+                self.employee_version[employee_id] = record.id
+    def bump_sequences(self, employee, week, old_entries, new_entries):
+        # Each rescheduled shift gets a higher SEQUENCE so clients replace the event.
+        old = {entry[0]: entry for entry in old_entries}
+        new = {entry[0]: entry for entry in new_entries}
+        sequences = self.sequences.setdefault(employee, {})
+        for day in old.keys() | new.keys():
+            if day in new and old.get(day) != new[day]:
+                shift_date = week + timedelta(days=WEEK_DAYS.index(day))
+                sequences[shift_date] = sequences.get(shift_date, 0) + 1
+
+    def feed(self, employee_id, name, since, timezone=None):
+        version = self.employee_version.get(employee_id, 0)
+        key = (employee_id, version, since, timezone, name)
+        cached = self.feeds.get(key)
+        if cached is None:
+            cached = build_ics(employee_id, name, self.entries.get(employee_id, {}), since, timezone,
+                               self.sequences.get(employee_id, {}))
+            with self.lock:
+                # Drop this employee's stale feeds before caching the new one.
+                for stale in [k for k in self.feeds if k[0] == employee_id]:
+                    del self.feeds[stale]
+                self.feeds[key] = cached
+        return version, cached
+
+
+def build_ics(employee_id, name, weeks, since, timezone=None, sequences=None):
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    tz = ZoneInfo(timezone) if timezone else None
+    sequences = sequences or {}
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{ics_escape(name)} shifts",
+    ]
+    if timezone:
+        lines.append(f"X-WR-TIMEZONE:{timezone}")
+    for week in sorted(weeks):
+        if week < since:
+            continue
+        for day, label, shift_type, is_morning in weeks[week]:
+            shift_date = week + timedelta(days=WEEK_DAYS.index(day))
+            start, end = shift_window(shift_type, is_morning)
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:employee-{employee_id}-{shift_date.isoformat()}@iqos-scheduler",
+                f"DTSTAMP:{stamp}",
+                f"SEQUENCE:{sequences.get(shift_date, 0)}",
+                f"DTSTART:{ics_datetime(shift_date, start, tz)}",
+                f"DTEND:{ics_datetime(shift_date, end, tz)}",
+                f"SUMMARY:{ics_escape(label)}",
+                "END:VEVENT",
+            ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+def feed_index():
+    # One index per app (and so per database), like the version cache in versions.py.
+    return current_app.extensions.setdefault("calendar_feed", FeedIndex())
+
+
+def feed_window_start(weeks, today=None):
+    return week_start_for(today or date.today()) - timedelta(weeks=weeks)
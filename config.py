@@ -1,4 +1,20 @@
 import os
+from shifts import WEEK_DAYS
+
+
+def engine_options(database_uri, pool_size, max_overflow):
+    # SQLite is a local file: pool sizing does not apply, and the lock wait is set
+    # by the busy_timeout pragma in SQLITE_PRAGMAS.
+    if database_uri.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_pre_ping": True,   # drop connections the server closed while idle
+        "pool_recycle": 1800,    # seconds; stay under Render/Postgres idle timeouts
+        "pool_timeout": 30,
+    }
+
 
 class BaseConfig:
     SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key")
@@ -11,6 +27,23 @@ class BaseConfig:
     if SQLALCHEMY_DATABASE_URI.startswith("postgres://"):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace("postgres://", "postgresql://")
 
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, pool_size=5, max_overflow=5)
+    # Applied on every new SQLite connection (ignored for PostgreSQL).
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+        "cache_size": -20000,  # KiB
+    }
+
+    # Per-request SQL instrumentation
+    SQL_INSTRUMENTATION = True
+    SQL_SLOW_QUERY_MS = 200
+    SQL_METRICS_PATH = "/metrics"
+    # Bearer token required by the metrics endpoint; the endpoint is off when unset.
+    SQL_METRICS_TOKEN = os.environ.get("SQL_METRICS_TOKEN")
+
     # Scheduling Defaults
     WEEK_WORKING_DAYS = 6  # 6 = store closed on Sunday, 7 = all week
     MIN_STAFF_PER_SHIFT = 0
@@ -23,14 +56,60 @@ class BaseConfig:
         "Saturday":  {"morning": 0, "evening": 0},
         "Sunday":    {"morning": 0, "evening": 0},
     }
+    # Per-time-slot minimums on top of the morning/evening counts:
+    # day -> list of (start, end, staff), checked per half-hour slot.
+    # Example: {"Saturday": [("20:30", "21:30", 2)]}
+    # By default someone must stay until closing: 6-hour evenings end at 21:00.
+    MIN_STAFF_PER_SLOT_DAY = {day: [("21:00", "21:30", 1)] for day in WEEK_DAYS}
+    # Optional per-time-slot caps in the same format; heads above a cap (e.g. where
+    # morning and evening shifts overlap) count against a schedule. Unset = uncapped.
+    # Example: {"Friday": [("13:30", "16:30", 5)]}
+    MAX_STAFF_PER_SLOT_DAY = {}
 
     # Preferred assignment override settings:
     LOCK_PREFERRED_OVERRIDES = True
     PREFERRED_OVERRIDE_THRESHOLD = 2  
     MAX_REBALANCE_ATTEMPTS = 10
+    FAIRNESS_HISTORY_WEEKS = 12  # finalized weeks considered when balancing off days and shifts
+    SCHEDULE_CANDIDATES = 8  # randomized schedules generated per run; the best-scoring one is kept
+    # >1 generates the candidates in that many worker processes. create_schedule runs
+    # inside the request, and forking a pool from a gevent worker can hang: raise it
+    # only for sync workers.
+    SCHEDULE_WORKERS = 1
+
+    # Per-employee iCalendar feeds (/schedule/calendar/<id>.ics)
+    ICAL_WEEKS = 8  # past weeks included in each feed
+    ICAL_TIMEZONE = os.environ.get("ICAL_TIMEZONE", "Europe/Athens")
+    ICAL_MAX_AGE = 300  # seconds clients may reuse a feed without revalidating
+
+    # What-if staffing simulation (/schedule/simulate, simulation.py)
+    SIMULATION_TRIALS = 8
+    SIMULATION_MAX_TRIALS = 32
+    SIMULATION_MAX_EXTRA_HEADCOUNT = 10
+    SIMULATION_MAX_SCENARIOS = 10
+    # Upper bound on schedules generated per request (scenarios x evaluations x trials);
+    # a few seconds of CPU for ~50 employees. Larger sweeps belong in the CLI.
+    SIMULATION_MAX_SCHEDULES = 1000
+    # The web endpoint runs in-process by default: forking a pool from a gevent
+    # worker can hang. Raise only for sync workers; the CLI uses a pool by default.
+    SIMULATION_WORKERS = 1
+
+    # Employee management listing
+    EMPLOYEES_PAGE_SIZE = 50
+    EMPLOYEES_MAX_PAGE_SIZE = 500
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
 
 class ProductionConfig(BaseConfig):
-    DEBUG = False
\ No newline at end of file
+    DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        BaseConfig.SQLALCHEMY_DATABASE_URI,
+        pool_size=int(os.environ.get("DB_POOL_SIZE", 10)),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+    )
+
+CONFIGS = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+}
\ No newline at end of file
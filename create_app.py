@@ -5,8 +5,11 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 
-from config import DevelopmentConfig
+import os
+
+from config import CONFIGS
 from models import db
+from instrumentation import init_sql_instrumentation
 # Import your blueprint modules
 from employees.routes import employees_bp
 from schedule.routes import schedule_bp
@@ -14,10 +17,11 @@ from settings.routes import settings_bp
 
 def create_app():
     app = Flask(__name__, template_folder="templates")
-    app.config.from_object(DevelopmentConfig)
+    app.config.from_object(CONFIGS[os.environ.get("APP_CONFIG", "development")])
 
     db.init_app(app)
     migrate = Migrate(app, db)
+    init_sql_instrumentation(app, db)
 
     # optional: enable CORS
     CORS(app)
@@ -1,10 +1,86 @@
 # employees/routes.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from models import db, Employee
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, abort
+from sqlalchemy import String, and_, or_, type_coerce
+from models import db, Employee, name_search_key
+from shifts import WEEK_DAYS
 
 employees_bp = Blueprint('employees', __name__, template_folder='templates')
 
+
+def prefix_upper_bound(prefix):
+    # Smallest string greater than every string starting with prefix, in code point order.
+    while prefix and prefix[-1] == chr(0x10FFFF):
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        following = 0xE000  # surrogates cannot be encoded
+    return prefix[:-1] + chr(following)
+
+
+def filtered_employees_query(args):
+    query = Employee.query
+
+    # Case-insensitive name prefix as a range over the case-folded name_key, so
+    # ix_employees_name_key can serve it on both SQLite and PostgreSQL (see models.py).
+    name_prefix = name_search_key((args.get('q') or '').strip())
+    if name_prefix:
+        query = query.filter(Employee.name_key >= name_prefix)
+        upper = prefix_upper_bound(name_prefix)
+        if upper is not None:
+            query = query.filter(Employee.name_key < upper)
+
+    shift_type = args.get('shift_type')
+    if shift_type:
+        query = query.filter(Employee.shift_type == shift_type)
+
+    # "Off on day X": a manual or preferred day off. The lists are stored as JSON text,
+    # so match the quoted day name against the raw column value. This is not indexed
+    # and scans the employees table; the other filters narrow the scan when combined.
+    off_day = args.get('off_day')
+    if off_day:
+        if off_day not in WEEK_DAYS:
+            abort(400, f"Invalid off_day: {off_day}")
+        pattern = f'%"{off_day}"%'
+        query = query.filter(or_(
+            type_coerce(Employee.manual_days_off, String).like(pattern),
+            type_coerce(Employee.preferred_day_off, String).like(pattern),
+        ))
+
+    return query
+
+
+def keyset_page(query, args):
+    config = current_app.config
+    try:
+        limit = int(args.get('limit', config.get('EMPLOYEES_PAGE_SIZE', 50)))
+    except ValueError:
+        limit = config.get('EMPLOYEES_PAGE_SIZE', 50)
+    limit = max(1, min(limit, config.get('EMPLOYEES_MAX_PAGE_SIZE', 500)))
+
+    # Keyset pagination on (name, id): the cursor is the last row of the previous page.
+    after_name = args.get('after_name')
+    after_id = args.get('after_id', type=int)
+    if after_name is not None and after_id is not None:
+        query = query.filter(or_(
+            Employee.name > after_name,
+            and_(Employee.name == after_name, Employee.id > after_id),
+        ))
+
+    rows = query.order_by(Employee.name, Employee.id).limit(limit + 1).all()
+    employees = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = employees[-1]
+        next_cursor = {"after_name": last.name, "after_id": last.id}
+    return employees, next_cursor
+
+
+def filter_args(args):
+    return {k: args[k] for k in ('q', 'shift_type', 'off_day', 'limit') if args.get(k)}
+
 @employees_bp.route('/', methods=['GET','POST'])
 def list_or_create():
     if request.method == 'POST':
@@ -22,7 +98,7 @@ def list_or_create():
 
         # shift requests
         shift_requests = {}
-        for day in ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]:
+        for day in WEEK_DAYS:
             val = request.form.get(f"shift_request_{day}")
             if val and val != "No Request":
                 shift_requests[day] = val
@@ -39,8 +115,34 @@ def list_or_create():
         flash("Employee added.")
         return redirect(url_for('employees.list_or_create'))
 
-    employees = Employee.query.all()
-    return render_template("employees.html", employees=employees)
+    employees, next_cursor = keyset_page(filtered_employees_query(request.args), request.args)
+    filters = filter_args(request.args)
+    next_page_args = dict(filters, **next_cursor) if next_cursor else None
+    return render_template(
+        "employees.html",
+        employees=employees,
+        filters=filters,
+        next_page_args=next_page_args,
+        days=WEEK_DAYS
+    )
+
+@employees_bp.route('/search')
+def search_employees():
+    employees, next_cursor = keyset_page(filtered_employees_query(request.args), request.args)
+    return jsonify({
+        "employees": [
+            {
+                "id": emp.id,
+                "name": emp.name,
+                "shift_type": emp.shift_type,
+                "preferred_day_off": emp.preferred_day_off or [],
+                "manual_days_off": emp.manual_days_off or [],
+                "shift_requests": emp.shift_requests or {},
+            }
+            for emp in employees
+        ],
+        "next": next_cursor,
+    })
 
 @employees_bp.route('/edit/<int:employee_id>', methods=['GET','POST'])
 def edit_employee(employee_id):
@@ -55,7 +157,7 @@ def edit_employee(employee_id):
 
         # shift requests
         shift_req = {}
-        for day in ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]:
+        for day in WEEK_DAYS:
             v = request.form.get(f"shift_request_{day}")
             if v and v != "No Request":
                 shift_req[day] = v
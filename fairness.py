@@ -0,0 +1,120 @@
+# fairness.py
+
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from sqlalchemy import func
+from models import db, Employee, EmployeeWeekStats
+from shifts import WEEK_DAYS
+
+
+COUNTER_COLUMNS = (
+    "shifts_worked",
+    "morning_shifts",
+    "evening_shifts",
+    "days_off",
+    "saturday_off",
+    "preferred_off_granted",
+    "preferred_off_overridden",
+    "shift_requests_honored",
+    "shift_requests_overridden",
+)
+
+
+def week_start_for(day):
+    return day - timedelta(days=day.weekday())
+
+
+def compute_week_stats(schedule, employees):
+    # Per-employee counters for one weekly schedule, keyed by employee name.
+    shifts_by_employee = defaultdict(dict)
+    for day in WEEK_DAYS:
+        for entry in schedule.get(day, []):
+            shifts_by_employee[entry["employee"]][day] = entry["shift"]
+
+    stats = {}
+    for emp in employees:
+        shifts = shifts_by_employee.get(emp.name, {})
+        off_days = [d for d in WEEK_DAYS if shifts.get(d) == "Assigned Day Off"]
+        preferred = set(emp.preferred_day_off or [])
+        requests = emp.shift_requests or {}
+        stats[emp.name] = {
+            "shifts_worked": sum(1 for s in shifts.values() if "Morning" in s or "Evening" in s),
+            "morning_shifts": sum(1 for s in shifts.values() if "Morning" in s),
+            "evening_shifts": sum(1 for s in shifts.values() if "Evening" in s),
+            "days_off": len(off_days),
+            "saturday_off": 1 if "Saturday" in off_days else 0,
+            "off_days": off_days,
+            "preferred_off_granted": len(preferred & set(off_days)),
+            "preferred_off_overridden": len(preferred - set(off_days) - {d for d, s in shifts.items() if s == "Store Closed"}),
+            "shift_requests_honored": sum(1 for d, r in requests.items() if r in shifts.get(d, "")),
+            "shift_requests_overridden": sum(1 for d, r in requests.items() if d in shifts and r not in shifts[d]),
+        }
+    return stats
+
+
+def record_week_stats(schedule, week_start, employees=None):
+    # Called once per finalized week; re-finalizing a week replaces its rows.
+    if employees is None:
+        employees = Employee.query.all()
+    stats = compute_week_stats(schedule, employees)
+    EmployeeWeekStats.query.filter_by(week_start=week_start).delete()
+    for emp in employees:
+        db.session.add(EmployeeWeekStats(
+            employee_id=emp.id,
+            employee_name=emp.name,
+            week_start=week_start,
+            **stats[emp.name]
+        ))
+    db.session.commit()
+    return stats
+
+
+def load_fairness_history(weeks, today=None):
+    # Compact per-employee history the scheduler uses to bias its choices:
+    # {name: {"off_days": Counter(day -> weeks off), "morning": n, "evening": n}}
+    if weeks <= 0:
+        return {}
+    since = week_start_for(today or date.today()) - timedelta(weeks=weeks)
+    rows = (
+        db.session.query(
+            EmployeeWeekStats.employee_name,
+            EmployeeWeekStats.off_days,
+            EmployeeWeekStats.morning_shifts,
+            EmployeeWeekStats.evening_shifts,
+        )
+        .filter(EmployeeWeekStats.week_start >= since)
+        .all()
+    )
+    history = defaultdict(lambda: {"off_days": Counter(), "morning": 0, "evening": 0})
+    for name, off_days, mornings, evenings in rows:
+        history[name]["off_days"].update(off_days or [])
+        history[name]["morning"] += mornings
+        history[name]["evening"] += evenings
+    return dict(history)
+
+
+def fairness_report(start=None, end=None):
+    query = db.session.query(
+        EmployeeWeekStats.employee_id,
+        EmployeeWeekStats.employee_name,
+        func.count(EmployeeWeekStats.id).label("weeks"),
+        *[func.sum(getattr(EmployeeWeekStats, column)).label(column) for column in COUNTER_COLUMNS]
+    )
+    if start is not None:
+        query = query.filter(EmployeeWeekStats.week_start >= start)
+    if end is not None:
+        query = query.filter(EmployeeWeekStats.week_start <= end)
+    rows = (
+        query.group_by(EmployeeWeekStats.employee_id, EmployeeWeekStats.employee_name)
+        .order_by(EmployeeWeekStats.employee_name)
+        .all()
+    )
+    return [
+        {
+            "employee_id": row.employee_id,
+            "employee": row.employee_name,
+            "weeks": row.weeks,
+            **{column: int(getattr(row, column) or 0) for column in COUNTER_COLUMNS},
+        }
+        for row in rows
+    ]
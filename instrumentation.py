@@ -0,0 +1,125 @@
+# instrumentation.py
+
+import hmac
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from flask import abort, g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+logger = logging.getLogger("scheduler.sql")
+
+
+class SQLMetrics:
+    """Running per-endpoint totals of requests, queries and SQL time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(lambda: {
+            "requests": 0,
+            "queries": 0,
+            "sql_time_ms": 0.0,
+            "max_queries": 0,
+            "slow_queries": 0,
+        })
+
+    def record(self, endpoint, queries, sql_time_ms, slow_queries):
+        with self.lock:
+            totals = self.endpoints[endpoint]
+            totals["requests"] += 1
+            totals["queries"] += queries
+            totals["sql_time_ms"] += sql_time_ms
+            totals["max_queries"] = max(totals["max_queries"], queries)
+            totals["slow_queries"] += slow_queries
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                endpoint: dict(totals,
+                               sql_time_ms=round(totals["sql_time_ms"], 3),
+                               queries_per_request=round(totals["queries"] / totals["requests"], 2))
+                for endpoint, totals in self.endpoints.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+def set_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
+
+def init_sql_instrumentation(app, db):
+    config = app.config
+    metrics = SQLMetrics()
+    app.extensions["sql_metrics"] = metrics
+
+    with app.app_context():
+        engine = db.engine
+
+    if engine.dialect.name == "sqlite" and config.get("SQLITE_PRAGMAS"):
+        event.listen(engine, "connect", set_sqlite_pragmas(config["SQLITE_PRAGMAS"]))
+
+    if not config.get("SQL_INSTRUMENTATION", True):
+        return metrics
+
+    slow_query_ms = config.get("SQL_SLOW_QUERY_MS", 200)
+
+    # The start time lives on the statement's execution context, not the pooled
+    # connection, so a statement that fails leaves nothing behind.
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.sql_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "sql_query_start", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        slow = elapsed_ms > slow_query_ms
+        if slow:
+            where = request.path if has_request_context() else "<no request>"
+            logger.warning("Slow query (%.1f ms) during %s: %s", elapsed_ms, where, statement)
+        if has_request_context() and "sql_queries" in g:
+            g.sql_queries += 1
+            g.sql_time_ms += elapsed_ms
+            g.sql_slow_queries += int(slow)
+
+    @app.before_request
+    def start_sql_counters():
+        g.sql_queries = 0
+        g.sql_time_ms = 0.0
+        g.sql_slow_queries = 0
+
+    @app.after_request
+    def report_sql_counters(response):
+        if "sql_queries" not in g:
+            return response
+        response.headers["X-SQL-Queries"] = str(g.sql_queries)
+        response.headers["X-SQL-Time-ms"] = f"{g.sql_time_ms:.3f}"
+        endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.record(endpoint, g.sql_queries, g.sql_time_ms, g.sql_slow_queries)
+        return response
+
+    metrics_token = config.get("SQL_METRICS_TOKEN")
+    if not metrics_token:
+        return metrics
+
+    @app.route(config.get("SQL_METRICS_PATH", "/metrics"))
+    def sql_metrics():
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {metrics_token}".encode()):
+            abort(401)
+        return jsonify({"slow_query_ms": slow_query_ms, "endpoints": metrics.snapshot()})
+
+    return metrics
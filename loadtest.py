@@ -0,0 +1,215 @@
+# loadtest.py
+#
+# Local HTTP load test: boots the app on a throwaway SQLite database seeded with a
+# synthetic workforce and drives the main endpoints with concurrent clients.
+#
+#   python loadtest.py --employees 80 --concurrency 8 --requests 200 --json results.json
+#
+# The scratch directory is removed when the run ends. Note that the export endpoints
+# write every response to the same schedule.csv / schedule.txt in the working
+# directory, so with --concurrency > 1 their numbers include interleaved writes to one
+# file rather than independent requests.
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from shifts import WEEK_DAYS
+
+EXPORT_ENDPOINTS = ("/schedule/download_csv", "/schedule/download_txt")
+DEFAULT_ENDPOINTS = [
+    "/schedule/",
+    "/schedule/download_csv",
+    "/schedule/download_txt",
+    "/employees/",
+    "/settings/",
+]
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE")
+
+
+class SQLCounter:
+    """Counts statements and rows written per Flask request path."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = defaultdict(int)
+        self.rows_written = defaultdict(int)
+
+    def install(self, engine):
+        from sqlalchemy import event
+
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        from flask import has_request_context, request
+
+        path = request.path if has_request_context() else "<startup>"
+        written = 0
+        if statement.lstrip().upper().startswith(WRITE_PREFIXES) and cursor.rowcount > 0:
+            written = cursor.rowcount
+        with self.lock:
+            self.queries[path] += 1
+            self.rows_written[path] += written
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.queries), dict(self.rows_written)
+
+
+def seed_workforce(db, Employee, count, rng):
+    for i in range(count):
+        shift_requests = {}
+        if rng.random() < 0.3:
+            shift_requests[rng.choice(WEEK_DAYS[:6])] = rng.choice(["Morning", "Evening"])
+        db.session.add(Employee(
+            name=f"Employee {i:04d}",
+            shift_type="8-hour" if rng.random() < 0.6 else "6-hour",
+            preferred_day_off=[rng.choice(WEEK_DAYS[:6])] if rng.random() < 0.5 else [],
+            manual_days_off=[rng.choice(WEEK_DAYS[:6])] if rng.random() < 0.1 else [],
+            shift_requests=shift_requests,
+        ))
+    db.session.commit()
+
+
+def fetch(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return time.perf_counter() - start, status
+
+
+def run_endpoint(base_url, path, requests, concurrency):
+    url = base_url + path
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: fetch(url), range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in results]) * 1000.0
+    errors = sum(1 for _, status in results if status is None or status >= 400)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(latencies.max()), 2),
+        },
+    }
+
+
+def print_report(report):
+    header = f"{'endpoint':<26}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'q/req':>8}{'rows':>8}"
+    print(header)
+    print("-" * len(header))
+    for path, result in report["endpoints"].items():
+        latency = result["latency_ms"]
+        print(f"{path:<26}{result['throughput_rps']:>9}{latency['p50']:>10}{latency['p95']:>10}"
+              f"{latency['p99']:>10}{result['errors']:>8}{result['queries_per_request']:>8}{result['rows_written']:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the scheduler app against a throwaway SQLite DB.")
+    parser.add_argument("--employees", type=int, default=50, help="synthetic employees to seed")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="endpoint path to drive (repeatable; default: main pages and exports)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic workforce")
+    parser.add_argument("--json", dest="json_path", help="write the report as JSON to this path")
+    args = parser.parse_args(argv)
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    if args.concurrency > 1 and any(path in EXPORT_ENDPOINTS for path in endpoints):
+        print("note: export endpoints share one output file; concurrent requests race on it", file=sys.stderr)
+
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="scheduler-loadtest-")
+    try:
+        return run_load_test(args, endpoints, workdir, json_path)
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_load_test(args, endpoints, workdir, json_path):
+    # The config reads DATABASE_URL at import time, so point it at the scratch DB first.
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    # The export endpoints write their files to the working directory.
+    os.chdir(workdir)
+
+    from werkzeug.serving import make_server
+    from create_app import app
+    from models import db, Employee
+
+    counter = SQLCounter()
+    with app.app_context():
+        db.create_all()
+        seed_workforce(db, Employee, args.employees, random.Random(args.seed))
+        counter.install(db.engine)
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    report = {
+        "config": {
+            "employees": args.employees,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+        },
+        "endpoints": {},
+    }
+    try:
+        for path in endpoints:
+            queries_before, rows_before = counter.snapshot()
+            result = run_endpoint(base_url, path, args.requests, args.concurrency)
+            queries_after, rows_after = counter.snapshot()
+            queries = queries_after.get(path, 0) - queries_before.get(path, 0)
+            result["queries"] = queries
+            result["queries_per_request"] = round(queries / args.requests, 2)
+            result["rows_written"] = rows_after.get(path, 0) - rows_before.get(path, 0)
+            report["endpoints"][path] = result
+    finally:
+        server.shutdown()
+        with app.app_context():
+            db.engine.dispose()
+
+    print_report(report)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
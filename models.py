@@ -1,7 +1,8 @@
 # models.py
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import validates
 from sqlalchemy.types import TypeDecorator, TEXT
 import json
 from datetime import datetime
@@ -12,7 +13,9 @@ db = SQLAlchemy()
 class PreviousSchedule(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.DateTime, default=datetime.utcnow)
+    # Full schedule for a weekly base; {"changes": ...} delta when base_id is set (see versions.py).
     data = db.Column(db.JSON, nullable=False)
+    base_id = db.Column(db.Integer, db.ForeignKey('previous_schedule.id'), nullable=True, index=True)
 
     def __repr__(self):
         return f'<PreviousSchedule {self.date}>'
@@ -51,16 +54,60 @@ class SafeJSONDict(TypeDecorator):
         except json.JSONDecodeError:
             return {}
 
+def name_search_key(name):
+    # Case-folded in Python rather than with SQL lower(), which only folds ASCII on
+    # SQLite, so that every backend stores and compares the same key.
+    return (name or "").casefold()
+
+
+# Compared by code point on every backend: SQLite's default BINARY collation does
+# this already, PostgreSQL needs "C" instead of the database's linguistic collation.
+SEARCH_KEY = String(200).with_variant(String(200, collation="C"), "postgresql")
+
+
 class Employee(db.Model):
     __tablename__ = "employees"
 
     id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
-    shift_type = Column(String(10), nullable=False)  # "8-hour" or "6-hour"
+    name = Column(String(100), nullable=False, index=True)
+    name_key = Column(SEARCH_KEY, nullable=False, index=True, default="")  # name_search_key(name)
+    shift_type = Column(String(10), nullable=False, index=True)  # "8-hour" or "6-hour"
 
     preferred_day_off = Column(SafeJSONList, nullable=True, default=[])
     manual_days_off = Column(SafeJSONList, nullable=True, default=[])
     shift_requests = Column(SafeJSONDict, nullable=True, default={})
 
+    @validates("name")
+    def sync_name_key(self, key, name):
+        self.name_key = name_search_key(name)
+        return name
+
     def __repr__(self):
         return f"<Employee {self.id} - {self.name}>"
+
+
+class EmployeeWeekStats(db.Model):
+    """Per-employee fairness counters for one finalized week."""
+    __tablename__ = "employee_week_stats"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "week_start", name="uq_employee_week_stats_employee_week"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), nullable=False, index=True)
+    employee_name = Column(String(100), nullable=False)
+    week_start = Column(Date, nullable=False, index=True)
+
+    shifts_worked = Column(Integer, nullable=False, default=0)
+    morning_shifts = Column(Integer, nullable=False, default=0)
+    evening_shifts = Column(Integer, nullable=False, default=0)
+    days_off = Column(Integer, nullable=False, default=0)
+    saturday_off = Column(Integer, nullable=False, default=0)
+    off_days = Column(SafeJSONList, nullable=True, default=[])
+    preferred_off_granted = Column(Integer, nullable=False, default=0)
+    preferred_off_overridden = Column(Integer, nullable=False, default=0)
+    shift_requests_honored = Column(Integer, nullable=False, default=0)
+    shift_requests_overridden = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<EmployeeWeekStats {self.employee_name} {self.week_start}>"
@@ -0,0 +1,66 @@
+# records.py
+
+from types import MappingProxyType
+from models import Employee
+
+# Config keys the scheduling code reads; copied into a plain dict so the
+# configuration can be shipped to worker processes.
+SCHEDULER_CONFIG_KEYS = (
+    "WEEK_WORKING_DAYS",
+    "MIN_STAFF_PER_SHIFT",
+    "MIN_STAFF_PER_SHIFT_DAY",
+    "MIN_STAFF_PER_SLOT_DAY",
+    "MAX_STAFF_PER_SLOT_DAY",
+    "LOCK_PREFERRED_OVERRIDES",
+    "PREFERRED_OVERRIDE_THRESHOLD",
+    "MAX_REBALANCE_ATTEMPTS",
+)
+
+
+class EmployeeRecord:
+    """Immutable, detached snapshot of an Employee for scheduling.
+
+    The JSON columns are parsed once: day lists become frozensets and shift
+    requests a read-only mapping. Records compare and hash by identity, like
+    ORM instances within a session, and pickle cleanly for process pools.
+    """
+
+    __slots__ = ("id", "name", "shift_type", "preferred_day_off", "manual_days_off", "shift_requests")
+
+    def __init__(self, id, name, shift_type, preferred_day_off=(), manual_days_off=(), shift_requests=None):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "shift_type", shift_type)
+        object.__setattr__(self, "preferred_day_off", frozenset(preferred_day_off or ()))
+        object.__setattr__(self, "manual_days_off", frozenset(manual_days_off or ()))
+        object.__setattr__(self, "shift_requests", MappingProxyType(dict(shift_requests or {})))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (type(self), (self.id, self.name, self.shift_type, tuple(self.preferred_day_off),
+                             tuple(self.manual_days_off), dict(self.shift_requests)))
+
+    def __repr__(self):
+        return f"<EmployeeRecord {self.id} - {self.name}>"
+
+    @classmethod
+    def from_employee(cls, emp):
+        return cls(emp.id, emp.name, emp.shift_type, emp.preferred_day_off, emp.manual_days_off, emp.shift_requests)
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return type(self)(**fields)
+
+
+def load_employee_records():
+    return tuple(EmployeeRecord.from_employee(emp) for emp in Employee.query.order_by(Employee.id).all())
+
+
+def config_snapshot(config):
+    return {key: config[key] for key in SCHEDULER_CONFIG_KEYS if key in config}
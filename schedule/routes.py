@@ -1,8 +1,16 @@
-from flask import Blueprint, render_template, send_file, current_app
+from flask import Blueprint, render_template, send_file, current_app, request, jsonify, abort
+import zlib
 import pandas as pd
 from collections import defaultdict
-from models import Employee
-from scheduler import create_schedule
+from datetime import date
+from models import db, Employee, PreviousSchedule
+from fairness import record_week_stats, fairness_report, week_start_for
+from simulation import run_simulation, validate_scenarios, bounded_int, estimated_schedules
+from records import load_employee_records, config_snapshot
+from versions import load_schedule, diff_versions, changed_cells
+from calendar_feed import feed_index, feed_window_start
+from scheduler import Scheduler, create_schedule
+from shifts import WEEK_DAYS, DEFAULT_MIN_STAFF, SLOT_LABELS, min_staff_for_day
 
 schedule_bp = Blueprint('schedule', __name__, template_folder='templates')
 
@@ -14,7 +22,7 @@ def schedule_view():
     global SCHEDULE_CACHE
     final_schedule = create_schedule()
     SCHEDULE_CACHE = final_schedule
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    days = WEEK_DAYS
     employee_schedule = {}
 
     for d in days:
@@ -75,25 +83,23 @@ def download_txt():
     all_employees = sorted([emp.name for emp in Employee.query.all()], key=lambda x: x.strip())
     config = current_app.config
     week_working_days = config.get("WEEK_WORKING_DAYS", 7)
-    fallback_min_staff = config.get("MIN_STAFF_PER_SHIFT", 3)
-    min_staff_day = config.get("MIN_STAFF_PER_SHIFT_DAY", {})
+    fallback_min_staff = config.get("MIN_STAFF_PER_SHIFT", DEFAULT_MIN_STAFF)
+    scheduler = Scheduler(config)
     txt_file = "schedule.txt"
     with open(txt_file, "w", encoding="utf-8") as f:
         f.write("=== DEBUG CONFIG SETTINGS ===\n")
         f.write(f"WEEK_WORKING_DAYS: {week_working_days}\n")
         f.write(f"Default MIN_STAFF_PER_SHIFT (fallback): {fallback_min_staff}\n")
         f.write("MIN_STAFF_PER_SHIFT_DAY:\n")
-        for d in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
-            staff_conf = min_staff_day.get(d, {})
-            m = staff_conf.get("morning", fallback_min_staff)
-            e = staff_conf.get("evening", fallback_min_staff)
+        for d in WEEK_DAYS:
+            min_staff = min_staff_for_day(config, d)
+            m, e = min_staff["morning"], min_staff["evening"]
             f.write(f"  {d}: morning={m}, evening={e}\n")
         f.write("\n")
-        for day in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
+        for day in WEEK_DAYS:
             assignments = final_schedule.get(day, [])
-            staff_conf = min_staff_day.get(day, {})
-            day_morn = staff_conf.get("morning", fallback_min_staff)
-            day_even = staff_conf.get("evening", fallback_min_staff)
+            min_staff = min_staff_for_day(config, day)
+            day_morn, day_even = min_staff["morning"], min_staff["evening"]
             f.write(f"=== {day} (MinStaff: morning={day_morn}, evening={day_even}) ===\n")
             day_shifts = {a["employee"]: a["shift"] for a in assignments}
             for emp in all_employees:
@@ -107,5 +113,148 @@ def download_txt():
                 f.write(f"⚠️ WARNING: Morning understaffed ({morn_count}/{day_morn})\n")
             if eve_count < day_even:
                 f.write(f"⚠️ WARNING: Evening understaffed ({eve_count}/{day_even})\n")
+            slot_min = scheduler.min_slot_staff[day]
+            slot_short = scheduler.day_slot_shortage(day, assignments)
+            for slot, short, needed in zip(SLOT_LABELS, slot_short, slot_min):
+                if short > 0:
+                    f.write(f"⚠️ WARNING: {slot} slot understaffed ({needed - short}/{needed})\n")
+            slot_max = scheduler.max_slot_staff[day]
+            slot_over = scheduler.day_slot_surplus(day, assignments)
+            for slot, over, cap in zip(SLOT_LABELS, slot_over, slot_max):
+                if over > 0:
+                    f.write(f"⚠️ WARNING: {slot} slot overstaffed ({cap + over}/{cap})\n")
             f.write("\n")
     return send_file(txt_file, as_attachment=True)
+
+
+def parse_date_arg(name, value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        abort(400, f"Invalid {name}: expected YYYY-MM-DD")
+
+@schedule_bp.route('/finalize', methods=['POST'])
+def finalize_schedule():
+    global SCHEDULE_CACHE
+    final_schedule = SCHEDULE_CACHE
+    if final_schedule is None:
+        latest = PreviousSchedule.query.order_by(PreviousSchedule.date.desc()).first()
+        if latest is None:
+            abort(404, "No schedule to finalize.")
+        final_schedule = load_schedule(latest.id)
+    week_start = parse_date_arg("week_start", request.values.get("week_start")) or date.today()
+    week_start = week_start_for(week_start)
+    stats = record_week_stats(final_schedule, week_start)
+    return jsonify({"week_start": week_start.isoformat(), "employees": len(stats)})
+
+@schedule_bp.route('/fairness')
+def fairness_view():
+    start = parse_date_arg("start", request.args.get("start"))
+    end = parse_date_arg("end", request.args.get("end"))
+    return jsonify({
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+        "employees": fairness_report(start, end),
+    })
+
+@schedule_bp.route('/simulate', methods=['POST'])
+def simulate_view():
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        abort(400, "Expected a JSON object")
+    config = current_app.config
+    scenarios = payload.get("scenarios")
+    try:
+        if scenarios is not None:
+            validate_scenarios(scenarios, config.get("SIMULATION_MAX_SCENARIOS", 20))
+        trials = bounded_int(payload.get("trials", config.get("SIMULATION_TRIALS", 8)), "trials",
+                             1, config.get("SIMULATION_MAX_TRIALS", 32))
+        max_extra = bounded_int(payload.get("max_extra_headcount", 5), "max_extra_headcount",
+                                0, config.get("SIMULATION_MAX_EXTRA_HEADCOUNT", 10))
+        headcount_search = payload.get("headcount_search", True)
+        if not isinstance(headcount_search, bool):
+            raise ValueError("headcount_search must be true or false")
+    except ValueError as exc:
+        abort(400, str(exc))
+    employees = load_employee_records()
+    # The sweep runs inside the request, on the worker's only thread of CPU.
+    budget = config.get("SIMULATION_MAX_SCHEDULES", 1000)
+    needed = estimated_schedules(employees, scenarios, trials, headcount_search, max_extra)
+    if needed > budget:
+        abort(400, f"Simulation too large: up to {needed} schedules, limit {budget}; "
+                   f"lower trials, scenarios or max_extra_headcount")
+    base_config = config_snapshot(config)
+    # Nothing else needs the DB; release the connection before the sweep.
+    db.session.remove()
+    results = run_simulation(
+        base_config,
+        employees,
+        scenarios,
+        trials=trials,
+        workers=config.get("SIMULATION_WORKERS", 1),
+        headcount_search=headcount_search,
+        max_extra_headcount=max_extra,
+    )
+    return jsonify({"scenarios": results})
+
+@schedule_bp.route('/versions')
+def list_versions():
+    limit = max(1, min(request.args.get("limit", 50, type=int), 500))
+    records = PreviousSchedule.query.order_by(PreviousSchedule.date.desc()).limit(limit).all()
+    versions = []
+    for record in records:
+        cells = changed_cells(record)
+        versions.append({
+            "id": record.id,
+            "date": record.date.isoformat() if record.date else None,
+            "base_id": record.base_id,
+            "changed_cells": len(cells) if cells is not None else None,
+        })
+    return jsonify({"versions": versions})
+
+@schedule_bp.route('/versions/<int:version_id>')
+def get_version(version_id):
+    record = PreviousSchedule.query.get_or_404(version_id)
+    return jsonify({
+        "id": record.id,
+        "date": record.date.isoformat() if record.date else None,
+        "base_id": record.base_id,
+        "schedule": load_schedule(record.id),
+    })
+
+@schedule_bp.route('/diff')
+def diff_view():
+    # Defaults to the latest version against the one before it.
+    to_id = request.args.get("to", type=int)
+    from_id = request.args.get("from", type=int)
+    if to_id is not None:
+        new_record = PreviousSchedule.query.get_or_404(to_id)
+    else:
+        new_record = PreviousSchedule.query.order_by(PreviousSchedule.date.desc()).first_or_404()
+    if from_id is not None:
+        old_record = PreviousSchedule.query.get_or_404(from_id)
+    else:
+        old_record = (
+            PreviousSchedule.query
+            .filter(PreviousSchedule.date <= new_record.date, PreviousSchedule.id != new_record.id)
+            .order_by(PreviousSchedule.date.desc())
+            .first_or_404()
+        )
+    changes = diff_versions(old_record, new_record)
+    return jsonify({"from": old_record.id, "to": new_record.id, "changes": changes})
+
+@schedule_bp.route('/calendar/<int:employee_id>.ics')
+def employee_calendar(employee_id):
+    emp = Employee.query.get_or_404(employee_id)
+    config = current_app.config
+    since = feed_window_start(config.get("ICAL_WEEKS", 8))
+    index = feed_index()
+    index.refresh(since)
+    timezone = config.get("ICAL_TIMEZONE")
+    version, body = index.feed(emp.id, emp.name, since, timezone)
+    response = current_app.response_class(body, mimetype="text/calendar")
+    # The calendar name is the employee's current name, so a rename changes the tag.
+    name_tag = f"{zlib.crc32(emp.name.encode('utf-8')):08x}"
+    response.set_etag(f"{employee_id}-{version}-{since.isoformat()}-{timezone or 'floating'}-{name_tag}")
+    response.headers["Cache-Control"] = f"private, max-age={config.get('ICAL_MAX_AGE', 300)}"
+    return response.make_conditional(request)
@@ -0,0 +1,190 @@
+# schedule_metrics.py
+
+import numpy as np
+from shifts import WEEK_DAYS, SLOT_STARTS, min_staff_for_day, shift_slot_mask, window_slot_mask
+
+SHIFT_KINDS = ("morning", "evening")
+MORNING, EVENING = 0, 1
+
+# Relative weight of each violation kind when ranking candidate schedules.
+SHORTAGE_WEIGHT = 100
+SLOT_SHORTAGE_WEIGHT = 20
+SLOT_SURPLUS_WEIGHT = 2
+EXCESS_SHIFT_WEIGHT = 10
+PREFERENCE_WEIGHT = 1
+
+# A schedule is encoded as a boolean array of shape (employees, days, shift kinds);
+# a batch of candidates adds a leading axis. All routines below work on the trailing
+# three axes, so they accept a single schedule or a whole batch.
+
+
+def shift_kind(shift):
+    if "Morning" in shift:
+        return MORNING
+    if "Evening" in shift:
+        return EVENING
+    return None
+
+
+def encode_schedule(schedule, employee_names, week_days=WEEK_DAYS):
+    index = {name: i for i, name in enumerate(employee_names)}
+    grid = np.zeros((len(employee_names), len(week_days), len(SHIFT_KINDS)), dtype=bool)
+    for d, day in enumerate(week_days):
+        for entry in schedule.get(day, []):
+            kind = shift_kind(entry["shift"])
+            e = index.get(entry["employee"])
+            if kind is not None and e is not None:
+                grid[e, d, kind] = True
+    return grid
+
+
+def encode_batch(schedules, employee_names, week_days=WEEK_DAYS):
+    return np.stack([encode_schedule(s, employee_names, week_days) for s in schedules])
+
+
+def min_staff_grid(config, week_days=WEEK_DAYS):
+    closed_sunday = config.get("WEEK_WORKING_DAYS", 7) == 6
+    grid = np.zeros((len(week_days), len(SHIFT_KINDS)), dtype=np.int32)
+    for d, day in enumerate(week_days):
+        if closed_sunday and day == "Sunday":
+            continue
+        min_staff = min_staff_for_day(config, day)
+        for k, kind in enumerate(SHIFT_KINDS):
+            grid[d, k] = min_staff[kind]
+    return grid
+
+
+def staffing_shortage(grid, min_staff):
+    # (..., days, kinds): missing heads per day and shift.
+    staffed = grid.sum(axis=-3, dtype=np.int32)
+    return np.clip(min_staff - staffed, 0, None)
+
+
+def shift_slot_matrix(shift_types):
+    # (employees, kinds, slots): which half-hour slots each employee's shifts cover.
+    matrix = np.zeros((len(shift_types), len(SHIFT_KINDS), len(SLOT_STARTS)), dtype=np.int32)
+    for e, shift_type in enumerate(shift_types):
+        matrix[e, MORNING] = shift_slot_mask(shift_type, True)
+        matrix[e, EVENING] = shift_slot_mask(shift_type, False)
+    return matrix
+
+
+def slot_coverage(grid, slot_matrix):
+    # (..., days, slots): heads on the floor per half-hour slot.
+    return np.einsum("...edk,eks->...ds", grid.astype(np.int32), slot_matrix)
+
+
+NO_SLOT_CAP = np.iinfo(np.int32).max
+
+
+def slot_rule_grid(config, key, fill, combine, week_days=WEEK_DAYS):
+    # Slot rules map a day to (start, end, staff) rules, e.g.
+    # {"Saturday": [("20:30", "21:30", 2)]}; overlapping rules are merged with combine.
+    rules_by_day = config.get(key, {})
+    closed_sunday = config.get("WEEK_WORKING_DAYS", 7) == 6
+    grid = np.full((len(week_days), len(SLOT_STARTS)), fill, dtype=np.int32)
+    for d, day in enumerate(week_days):
+        if closed_sunday and day == "Sunday":
+            continue
+        for start, end, staff in rules_by_day.get(day, []):
+            mask = window_slot_mask(start, end)
+            grid[d, mask] = combine(grid[d, mask], int(staff))
+    return grid
+
+
+def min_staff_slot_grid(config, week_days=WEEK_DAYS):
+    # MIN_STAFF_PER_SLOT_DAY; overlapping rules take the maximum, unset slots need nobody.
+    return slot_rule_grid(config, "MIN_STAFF_PER_SLOT_DAY", 0, np.maximum, week_days)
+
+
+def max_staff_slot_grid(config, week_days=WEEK_DAYS):
+    # MAX_STAFF_PER_SLOT_DAY; overlapping rules take the minimum, unset slots are uncapped.
+    return slot_rule_grid(config, "MAX_STAFF_PER_SLOT_DAY", NO_SLOT_CAP, np.minimum, week_days)
+
+
+def slot_shortage(coverage, min_slots):
+    return np.clip(min_slots - coverage, 0, None)
+
+
+def slot_surplus(coverage, max_slots):
+    return np.clip(coverage - max_slots, 0, None)
+
+
+def worked_shifts(grid):
+    # (..., employees)
+    return grid.any(axis=-1).sum(axis=-1, dtype=np.int32)
+
+
+def allowed_shifts_vector(scheduler, employees):
+    return np.array([scheduler.get_allowed_shifts(emp) for emp in employees], dtype=np.int32)
+
+
+def excess_shifts(grid, allowed):
+    return np.clip(worked_shifts(grid) - allowed, 0, None)
+
+
+def preference_masks(employees, week_days=WEEK_DAYS):
+    day_index = {day: d for d, day in enumerate(week_days)}
+    kind_index = {"Morning": MORNING, "Evening": EVENING}
+    requested = np.zeros((len(employees), len(week_days), len(SHIFT_KINDS)), dtype=bool)
+    preferred_off = np.zeros((len(employees), len(week_days)), dtype=bool)
+    for e, emp in enumerate(employees):
+        for day, shift in (emp.shift_requests or {}).items():
+            if day in day_index and shift in kind_index:
+                requested[e, day_index[day], kind_index[shift]] = True
+        for day in emp.preferred_day_off or []:
+            if day in day_index:
+                preferred_off[e, day_index[day]] = True
+    return requested, preferred_off
+
+
+def preference_violations(grid, requested, preferred_off):
+    # A shift request is violated when the requested shift is not worked; a preferred
+    # day off is violated when any shift is worked on that day. Result: (..., employees).
+    missed_requests = (requested & ~grid).any(axis=-1).sum(axis=-1, dtype=np.int32)
+    worked_preferred = (preferred_off & grid.any(axis=-1)).sum(axis=-1, dtype=np.int32)
+    return missed_requests + worked_preferred
+
+
+def evaluate_batch(grid, min_staff, allowed, requested, preferred_off, slot_matrix=None, min_slots=None,
+                   max_slots=None):
+    shortage = staffing_shortage(grid, min_staff)
+    excess = excess_shifts(grid, allowed)
+    violations = preference_violations(grid, requested, preferred_off)
+    score = (SHORTAGE_WEIGHT * shortage.sum(axis=(-2, -1))
+             + EXCESS_SHIFT_WEIGHT * excess.sum(axis=-1)
+             + PREFERENCE_WEIGHT * violations.sum(axis=-1))
+    result = {
+        "shortage": shortage,
+        "worked": worked_shifts(grid),
+        "excess": excess,
+        "preference_violations": violations,
+    }
+    if slot_matrix is not None:
+        coverage = slot_coverage(grid, slot_matrix)
+        result["slot_coverage"] = coverage
+        if min_slots is not None:
+            result["slot_shortage"] = slot_shortage(coverage, min_slots)
+            score = score + SLOT_SHORTAGE_WEIGHT * result["slot_shortage"].sum(axis=(-2, -1))
+        if max_slots is not None:
+            # Heads above the per-slot cap, typically where morning and evening overlap.
+            result["slot_surplus"] = slot_surplus(coverage, max_slots)
+            score = score + SLOT_SURPLUS_WEIGHT * result["slot_surplus"].sum(axis=(-2, -1))
+    result["score"] = score
+    return result
+
+
+def evaluate_schedules(schedules, employees, scheduler, config):
+    names = [emp.name for emp in employees]
+    grid = encode_batch(schedules, names, scheduler.week_days)
+    requested, preferred_off = preference_masks(employees, scheduler.week_days)
+    return evaluate_batch(
+        grid,
+        min_staff_grid(config, scheduler.week_days),
+        allowed_shifts_vector(scheduler, employees),
+        requested,
+        preferred_off,
+        shift_slot_matrix([emp.shift_type for emp in employees]),
+        min_staff_slot_grid(config, scheduler.week_days),
+        max_staff_slot_grid(config, scheduler.week_days),
+    )
@@ -1,15 +1,33 @@
 from collections import defaultdict, Counter
 from flask import current_app
-from datetime import datetime
-from models import PreviousSchedule, db, Employee
+from concurrent.futures import ProcessPoolExecutor
+from models import PreviousSchedule, db
+from records import load_employee_records, config_snapshot
+from fairness import load_fairness_history
+from versions import load_schedule, save_schedule_version
+from schedule_metrics import (
+    SLOT_SHORTAGE_WEIGHT, SLOT_SURPLUS_WEIGHT, NO_SLOT_CAP,
+    evaluate_schedules, min_staff_slot_grid, max_staff_slot_grid,
+)
+from shifts import WEEK_DAYS, min_staff_for_day, shift_label, shift_slot_mask
+import numpy as np
 import random
 
 class Scheduler:
-    def __init__(self, config):
+    # Works on detached records.EmployeeRecord snapshots, never on ORM instances,
+    # so generation needs no DB session and can run in worker processes.
+    def __init__(self, config, fairness=None):
         self.config = config
+        # Long-run per-employee history (see fairness.load_fairness_history), used to
+        # break ties in off-day and shift choices.
+        self.fairness = fairness or {}
         # Order of days remains constant
-        self.week_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+        self.week_days = list(WEEK_DAYS)
         self.week_working_days = config.get("WEEK_WORKING_DAYS", 7)
+        # Per-day minimum and maximum heads for every half-hour slot (zeros and
+        # NO_SLOT_CAP when not configured).
+        self.min_slot_staff = dict(zip(self.week_days, min_staff_slot_grid(config, self.week_days)))
+        self.max_slot_staff = dict(zip(self.week_days, max_staff_slot_grid(config, self.week_days)))
 
     def generate_schedule(self, employees, previous_week_off_days=None):
         # Build a schedule dict with a list per day.
@@ -20,7 +38,7 @@ class Scheduler:
             # For a 6-day workweek, Sunday is closed.
             if self.week_working_days == 6 and day == "Sunday":
                 for emp in employees:
-                    schedule[day].append({"employee": emp.name, "shift": "Store Closed"})
+                    schedule[day].append({"employee": emp.name, "employee_id": emp.id, "shift": "Store Closed"})
                 continue
 
             # Only include employees not off on the day.
@@ -31,6 +49,7 @@ class Scheduler:
                 if day in off_days[emp.name]:
                     schedule[day].append({
                         "employee": emp.name,
+                        "employee_id": emp.id,
                         "shift": "Assigned Day Off",
                         "source": off_days[emp.name][day]
                     })
@@ -47,7 +66,7 @@ class Scheduler:
 
         for emp in employees:
             # Record manual off days first.
-            manual_off = set(emp.manual_days_off or [])
+            manual_off = emp.manual_days_off
             for day in manual_off:
                 off_days[emp.name][day] = "manual"
                 days_off_counter[day] += 1
@@ -64,9 +83,9 @@ class Scheduler:
             required_off_days = base_required + len(manual_off)
 
             # Employee’s explicitly preferred off days.
-            explicit_preferred = set(emp.preferred_day_off or [])
+            explicit_preferred = emp.preferred_day_off
             # Exclude days for which the employee has a shift request.
-            shift_request_days = set(emp.shift_requests.keys()) if emp.shift_requests else set()
+            shift_request_days = frozenset(emp.shift_requests)
             available_preferred = explicit_preferred - shift_request_days
 
             # While not enough off days are assigned, add additional off days.
@@ -76,8 +95,9 @@ class Scheduler:
                     potential_days = (set(self.week_days) - shift_request_days) - set(off_days[emp.name].keys())
                 if not potential_days:
                     potential_days = set(self.week_days) - set(off_days[emp.name].keys())
-                # Choose the day with the fewest off assignments.
-                least_populated_days = sorted(potential_days, key=lambda d: days_off_counter[d])
+                # Choose the day with the fewest off assignments; among equals, the day this
+                # employee has had off least often in past weeks.
+                least_populated_days = sorted(potential_days, key=lambda d: (days_off_counter[d], self.past_days_off(emp.name, d)))
                 day_to_add = least_populated_days[0]
                 source_type = 'preferred' if day_to_add in explicit_preferred else 'dynamic'
                 off_days[emp.name][day_to_add] = source_type
@@ -90,18 +110,45 @@ class Scheduler:
 
         # First honor explicit shift requests.
         for emp in available_employees:
-            request = (emp.shift_requests or {}).get(day)
+            request = emp.shift_requests.get(day)
             if request == "Morning":
                 morning_shift.append((emp, True))  # mark as preferred
             elif request == "Evening":
                 evening_shift.append((emp, True))
 
         # For remaining employees, assign shifts to balance staffing.
-        remaining_employees = [emp for emp in available_employees if emp not in [t[0] for t in morning_shift + evening_shift]]
+        requested = {emp for emp, _ in morning_shift + evening_shift}
+        remaining_employees = [emp for emp in available_employees if emp not in requested]
         random.shuffle(remaining_employees)
-        while remaining_employees:
-            emp = remaining_employees.pop()
-            if len(morning_shift) <= len(evening_shift):
+        # Balance the day: fill up to half of it with mornings, starting with the
+        # employees who historically worked the most evenings.
+        total = len(morning_shift) + len(evening_shift) + len(remaining_employees)
+        morning_quota = min(len(remaining_employees), max(0, (total + 1) // 2 - len(morning_shift)))
+        if self.fairness:
+            remaining_employees.sort(key=lambda emp: self.evening_share(emp.name), reverse=True)
+        min_slots, max_slots = self.min_slot_staff[day], self.max_slot_staff[day]
+        slot_rules = min_slots.any() or (max_slots < NO_SLOT_CAP).any()
+        coverage = np.zeros_like(min_slots)
+        for emp, _ in morning_shift:
+            coverage += shift_slot_mask(emp.shift_type, True)
+        for emp, _ in evening_shift:
+            coverage += shift_slot_mask(emp.shift_type, False)
+        for emp in remaining_employees:
+            is_morning = morning_quota > 0
+            if slot_rules:
+                # Prefer the shift that covers more still-understaffed slots and
+                # pushes fewer slots over their cap.
+                deficit, full = min_slots > coverage, coverage >= max_slots
+                morning, evening = shift_slot_mask(emp.shift_type, True), shift_slot_mask(emp.shift_type, False)
+                morning_gain = (SLOT_SHORTAGE_WEIGHT * int((deficit & morning).sum())
+                                - SLOT_SURPLUS_WEIGHT * int((full & morning).sum()))
+                evening_gain = (SLOT_SHORTAGE_WEIGHT * int((deficit & evening).sum())
+                                - SLOT_SURPLUS_WEIGHT * int((full & evening).sum()))
+                if morning_gain != evening_gain:
+                    is_morning = morning_gain > evening_gain
+            coverage += shift_slot_mask(emp.shift_type, is_morning)
+            if is_morning:
+                morning_quota -= 1
                 morning_shift.append((emp, False))
             else:
                 evening_shift.append((emp, False))
@@ -110,6 +157,7 @@ class Scheduler:
         for emp, preferred in morning_shift:
             entry = {
                 "employee": emp.name,
+                "employee_id": emp.id,
                 "shift": self.get_shift_label(emp.shift_type, True),
                 "shift_type": emp.shift_type  # include shift type for flipping
             }
@@ -119,6 +167,7 @@ class Scheduler:
         for emp, preferred in evening_shift:
             entry = {
                 "employee": emp.name,
+                "employee_id": emp.id,
                 "shift": self.get_shift_label(emp.shift_type, False),
                 "shift_type": emp.shift_type  # include shift type for flipping
             }
@@ -132,7 +181,7 @@ class Scheduler:
             if self.week_working_days == 6 and day == "Sunday":
                 continue
 
-            min_staff = self.config.get("MIN_STAFF_PER_SHIFT_DAY", {}).get(day, {'morning': 3, 'evening': 3})
+            min_staff = min_staff_for_day(self.config, day)
             attempts = 0
             max_attempts = self.config.get("MAX_REBALANCE_ATTEMPTS", 10)
             while attempts < max_attempts:
@@ -158,11 +207,69 @@ class Scheduler:
                 self.flip_dynamic_shifts(day, schedule, employees)
                 attempts += 1
 
+            self.enforce_slot_coverage(day, schedule)
+
+    def day_slot_coverage(self, day, entries):
+        coverage = np.zeros_like(self.min_slot_staff[day])
+        for entry in entries:
+            if "Morning" in entry["shift"]:
+                coverage += shift_slot_mask(entry.get("shift_type"), True)
+            elif "Evening" in entry["shift"]:
+                coverage += shift_slot_mask(entry.get("shift_type"), False)
+        return coverage
+
+    def day_slot_shortage(self, day, entries):
+        return np.clip(self.min_slot_staff[day] - self.day_slot_coverage(day, entries), 0, None)
+
+    def day_slot_surplus(self, day, entries):
+        return np.clip(self.day_slot_coverage(day, entries) - self.max_slot_staff[day], 0, None)
+
+    def day_slot_penalty(self, day, entries):
+        coverage = self.day_slot_coverage(day, entries)
+        shortage = np.clip(self.min_slot_staff[day] - coverage, 0, None)
+        surplus = np.clip(coverage - self.max_slot_staff[day], 0, None)
+        return SLOT_SHORTAGE_WEIGHT * int(shortage.sum()) + SLOT_SURPLUS_WEIGHT * int(surplus.sum())
+
+    def enforce_slot_coverage(self, day, schedule):
+        # Greedily flip non-preferred shifts while it lowers the weighted per-slot
+        # shortage and surplus without dropping below the morning/evening minimums.
+        if not self.min_slot_staff[day].any() and not (self.max_slot_staff[day] < NO_SLOT_CAP).any():
+            return
+        min_staff = min_staff_for_day(self.config, day)
+        for _ in range(len(schedule[day])):
+            current = self.day_slot_penalty(day, schedule[day])
+            if current == 0:
+                break
+            morning_count = len([s for s in schedule[day] if "Morning" in s["shift"]])
+            evening_count = len([s for s in schedule[day] if "Evening" in s["shift"]])
+            best_entry, best_penalty = None, current
+            for entry in schedule[day]:
+                if entry.get("source") == "preferred_shift":
+                    continue
+                if "Morning" in entry["shift"]:
+                    if morning_count - 1 < min_staff['morning']:
+                        continue
+                elif "Evening" in entry["shift"]:
+                    if evening_count - 1 < min_staff['evening']:
+                        continue
+                else:
+                    continue
+                original = entry["shift"]
+                entry["shift"] = self.get_shift_label(entry["shift_type"], is_morning="Evening" in original)
+                penalty = self.day_slot_penalty(day, schedule[day])
+                entry["shift"] = original
+                if penalty < best_penalty:
+                    best_entry, best_penalty = entry, penalty
+            if best_entry is None:
+                break
+            best_entry["shift"] = self.get_shift_label(best_entry["shift_type"], is_morning="Evening" in best_entry["shift"])
+            best_entry["source"] = "flipped_dynamic"
+
     def rebalance_days_off(self, schedule, off_days, employees, day):
         # Create a counter for how many employees have each off day.
         days_off_counter = Counter(day for offs in off_days.values() for day in offs)
         lock_preferred = self.config.get("LOCK_PREFERRED_OVERRIDES", True)
-        min_staff = self.config.get("MIN_STAFF_PER_SHIFT_DAY", {}).get(day, {'morning': 3, 'evening': 3})
+        min_staff = min_staff_for_day(self.config, day)
 
         shifts = schedule[day]
         morning_count = len([s for s in shifts if "Morning" in s["shift"]])
@@ -170,7 +277,7 @@ class Scheduler:
         total_shortage = max(0, min_staff["morning"] - morning_count) + max(0, min_staff["evening"] - evening_count)
 
         # Step 0: Reassign off day for any employee with an explicit shift request for this day.
-        conflict_candidates = [emp for emp in employees if day in off_days[emp.name] and (emp.shift_requests and day in emp.shift_requests)]
+        conflict_candidates = [emp for emp in employees if day in off_days[emp.name] and day in emp.shift_requests]
         if conflict_candidates:
             for emp in conflict_candidates:
                 potential_days = (set(self.week_days) - set(emp.shift_requests.keys())) - set(off_days[emp.name].keys())
@@ -186,7 +293,7 @@ class Scheduler:
                     current_morning = len([s for s in schedule[day] if "Morning" in s["shift"]])
                     current_evening = len([s for s in schedule[day] if "Evening" in s["shift"]])
                     new_shift = self.get_shift_label(emp.shift_type, True) if current_morning <= current_evening else self.get_shift_label(emp.shift_type, False)
-                    schedule[day].append({"employee": emp.name, "shift": new_shift, "shift_type": emp.shift_type})
+                    schedule[day].append({"employee": emp.name, "employee_id": emp.id, "shift": new_shift, "shift_type": emp.shift_type})
                     return True
 
         # Step 1: Flip dynamic off days.
@@ -201,7 +308,7 @@ class Scheduler:
                     current_morning = len([s for s in schedule[day] if "Morning" in s["shift"]])
                     current_evening = len([s for s in schedule[day] if "Evening" in s["shift"]])
                     new_shift = self.get_shift_label(emp.shift_type, True) if current_morning <= current_evening else self.get_shift_label(emp.shift_type, False)
-                    schedule[day].append({"employee": emp.name, "shift": new_shift, "shift_type": emp.shift_type})
+                    schedule[day].append({"employee": emp.name, "employee_id": emp.id, "shift": new_shift, "shift_type": emp.shift_type})
                     return True
 
         # Step 2: Preferred override if allowed and staffing shortage persists.
@@ -211,7 +318,7 @@ class Scheduler:
                 preferred_candidates.sort(key=lambda emp: sum(1 for d, src in off_days[emp.name].items() if src == 'preferred'))
                 for emp in preferred_candidates:
                     potential_days = sorted(
-                        set(self.week_days) - set(off_days[emp.name].keys()) - set(emp.manual_days_off or []),
+                        set(self.week_days) - set(off_days[emp.name].keys()) - emp.manual_days_off,
                         key=lambda d: days_off_counter[d]
                     )
                     if potential_days:
@@ -224,7 +331,7 @@ class Scheduler:
                         current_morning = len([s for s in schedule[day] if "Morning" in s["shift"]])
                         current_evening = len([s for s in schedule[day] if "Evening" in s["shift"]])
                         new_shift = self.get_shift_label(emp.shift_type, True) if current_morning <= current_evening else self.get_shift_label(emp.shift_type, False)
-                        schedule[day].append({"employee": emp.name, "shift": new_shift, "shift_type": emp.shift_type})
+                        schedule[day].append({"employee": emp.name, "employee_id": emp.id, "shift": new_shift, "shift_type": emp.shift_type})
                         return True
 
         return False
@@ -233,7 +340,7 @@ class Scheduler:
         # Get current entries for the day.
         morning_entries = [entry for entry in schedule[day] if "Morning" in entry["shift"]]
         evening_entries = [entry for entry in schedule[day] if "Evening" in entry["shift"]]
-        min_staff = self.config.get("MIN_STAFF_PER_SHIFT_DAY", {}).get(day, {'morning': 0, 'evening': 0})
+        min_staff = min_staff_for_day(self.config, day)
         
         # First, if evening is understaffed, try flipping dynamic candidates from morning to evening.
         shortage_evening = min_staff['evening'] - len(evening_entries)
@@ -269,15 +376,23 @@ class Scheduler:
                     if shortage_morning <= 0:
                         break
 
+    def past_days_off(self, name, day):
+        history = self.fairness.get(name)
+        return history["off_days"][day] if history else 0
+
+    def evening_share(self, name):
+        history = self.fairness.get(name)
+        if not history or not (history["morning"] + history["evening"]):
+            return 0.5
+        return history["evening"] / (history["morning"] + history["evening"])
+
     def get_shift_label(self, shift_type, is_morning):
-        if shift_type == "8-hour":
-            return "Morning (08:30–16:30)" if is_morning else "Evening (13:30–21:30)"
-        return "Morning (09:00–15:00)" if is_morning else "Evening (15:00–21:00)"
+        return shift_label(shift_type, is_morning)
 
     def get_allowed_shifts(self, emp):
         # For 8-hour employees: max shifts = 5 - (# manual off days)
         # For 6-hour employees: max shifts = 6 - (# manual off days)
-        manual_off_count = len(emp.manual_days_off or [])
+        manual_off_count = len(emp.manual_days_off)
         if emp.shift_type == "8-hour":
             return 5 - manual_off_count
         return 6 - manual_off_count
@@ -290,25 +405,44 @@ class Scheduler:
                     count += 1
         return count
 
+def _generate_candidate(args):
+    config, fairness, employees, previous_week_off_days, seed = args
+    random.seed(seed)
+    return Scheduler(config, fairness).generate_schedule(employees, previous_week_off_days)
+
 def create_schedule():
     config = current_app.config
-    employees = Employee.query.all()
+    employees = load_employee_records()
     last_week_schedule = PreviousSchedule.query.order_by(PreviousSchedule.date.desc()).first()
     previous_week_off_days = defaultdict(set)
 
     if last_week_schedule:
-        for day, shifts in last_week_schedule.data.items():
+        for day, shifts in load_schedule(last_week_schedule.id).items():
             for shift in shifts:
                 if shift['shift'] == 'Assigned Day Off':
                     previous_week_off_days[shift['employee']].add(day)
 
-    scheduler = Scheduler(config)
-    schedule = scheduler.generate_schedule(employees, previous_week_off_days)
-
-    new_schedule_record = PreviousSchedule(
-        date=datetime.utcnow(),
-        data=schedule
-    )
-    db.session.add(new_schedule_record)
-    db.session.commit()
+    fairness = load_fairness_history(config.get("FAIRNESS_HISTORY_WEEKS", 12))
+    # Everything is loaded: release the connection before the CPU-heavy part.
+    db.session.close()
+
+    scheduler = Scheduler(config, fairness)
+    # Best-of-N: generate several randomized candidates and keep the one with the
+    # fewest shortages, excess shifts and preference violations.
+    candidates = max(1, config.get("SCHEDULE_CANDIDATES", 1))
+    workers = config.get("SCHEDULE_WORKERS", 1)
+    if workers and workers > 1 and candidates > 1:
+        snapshot = config_snapshot(config)
+        tasks = [(snapshot, fairness, employees, previous_week_off_days, random.randrange(2 ** 32))
+                 for _ in range(candidates)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            schedules = list(pool.map(_generate_candidate, tasks))
+    else:
+        schedules = [scheduler.generate_schedule(employees, previous_week_off_days) for _ in range(candidates)]
+    schedule = schedules[0]
+    if len(schedules) > 1:
+        scores = evaluate_schedules(schedules, employees, scheduler, config)["score"]
+        schedule = schedules[int(np.argmin(scores))]
+
+    save_schedule_version(schedule)
     return schedule
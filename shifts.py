@@ -0,0 +1,62 @@
+# shifts.py
+
+import numpy as np
+
+WEEK_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DEFAULT_MIN_STAFF = 3  # per shift, when neither the day nor MIN_STAFF_PER_SHIFT is configured
+
+# Concrete shift windows per contract type. Labels, coverage curves and calendar
+# times are all derived from this table.
+SHIFT_WINDOWS = {
+    "8-hour": {"morning": ("08:30", "16:30"), "evening": ("13:30", "21:30")},
+    "6-hour": {"morning": ("09:00", "15:00"), "evening": ("15:00", "21:00")},
+}
+DEFAULT_SHIFT_TYPE = "6-hour"
+
+SLOT_MINUTES = 30
+
+
+def to_minutes(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def to_hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def shift_window(shift_type, is_morning):
+    windows = SHIFT_WINDOWS.get(shift_type, SHIFT_WINDOWS[DEFAULT_SHIFT_TYPE])
+    return windows["morning" if is_morning else "evening"]
+
+
+def shift_label(shift_type, is_morning):
+    start, end = shift_window(shift_type, is_morning)
+    return f"{'Morning' if is_morning else 'Evening'} ({start}–{end})"
+
+
+STORE_OPEN = min(to_minutes(w[0]) for windows in SHIFT_WINDOWS.values() for w in windows.values())
+STORE_CLOSE = max(to_minutes(w[1]) for windows in SHIFT_WINDOWS.values() for w in windows.values())
+SLOT_STARTS = np.arange(STORE_OPEN, STORE_CLOSE, SLOT_MINUTES)
+SLOT_LABELS = [to_hhmm(int(m)) for m in SLOT_STARTS]
+
+
+def window_slot_mask(start, end):
+    # Slots are half-open [slot, slot + SLOT_MINUTES); a slot counts as covered when the
+    # window spans all of it.
+    return (SLOT_STARTS >= to_minutes(start)) & (SLOT_STARTS + SLOT_MINUTES <= to_minutes(end))
+
+
+def min_staff_for_day(config, day):
+    # The single source of the morning/evening minimum for a day: the per-day setting,
+    # falling back to MIN_STAFF_PER_SHIFT for missing days or shifts.
+    fallback = config.get("MIN_STAFF_PER_SHIFT", DEFAULT_MIN_STAFF)
+    staff_conf = config.get("MIN_STAFF_PER_SHIFT_DAY", {}).get(day, {})
+    return {
+        "morning": staff_conf.get("morning", fallback),
+        "evening": staff_conf.get("evening", fallback),
+    }
+
+
+def shift_slot_mask(shift_type, is_morning):
+    return window_slot_mask(*shift_window(shift_type, is_morning))
@@ -0,0 +1,334 @@
+# simulation.py
+#
+# What-if staffing sweeps. Scenarios are evaluated on detached copies of the
+# employees, so nothing is written to the database.
+#
+#   python simulation.py scenarios.json --trials 8 --workers 4 --json results.json
+#
+# A scenario is a dict such as:
+#   {
+#     "name": "Saturday 3/3 with two on leave",
+#     "remove": ["Alice"],                                # employees left out
+#     "extra_days_off": {"Bob": ["Saturday"]},            # added manual days off
+#     "add": [{"shift_type": "6-hour"}],                  # hypothetical hires
+#     "min_staff": {"Saturday": {"morning": 3, "evening": 3}},
+#     "min_staff_slots": {"Saturday": [["20:30", "21:30", 2]]},
+#     "week_working_days": 6
+#   }
+
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from records import EmployeeRecord, config_snapshot, load_employee_records
+from scheduler import Scheduler
+from schedule_metrics import SHIFT_KINDS, evaluate_schedules
+from shifts import WEEK_DAYS, to_minutes
+
+SHIFT_TYPES = ("8-hour", "6-hour")
+SHIFT_REQUESTS = ("Morning", "Evening")
+
+
+def _check(condition, message):
+    if not condition:
+        raise ValueError(message)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_days(value, where):
+    _check(isinstance(value, list) and all(day in WEEK_DAYS for day in value),
+           f"{where} must be a list of day names")
+
+
+def _check_hhmm(value, where):
+    try:
+        minutes = to_minutes(value)
+    except (AttributeError, ValueError):
+        minutes = None
+    _check(isinstance(value, str) and minutes is not None and 0 <= minutes <= 24 * 60,
+           f"{where} must be an HH:MM time")
+
+
+def validate_scenarios(scenarios, max_scenarios=None):
+    # Raises ValueError describing the first problem; scenarios come from JSON input.
+    _check(isinstance(scenarios, list), "scenarios must be a list")
+    _check(max_scenarios is None or len(scenarios) <= max_scenarios,
+           f"at most {max_scenarios} scenarios per request")
+    for i, scenario in enumerate(scenarios):
+        where = f"scenarios[{i}]"
+        _check(isinstance(scenario, dict), f"{where} must be an object")
+        _check(isinstance(scenario.get("name", ""), str), f"{where}.name must be a string")
+        if "week_working_days" in scenario:
+            _check(scenario["week_working_days"] in (6, 7), f"{where}.week_working_days must be 6 or 7")
+        remove = scenario.get("remove", [])
+        _check(isinstance(remove, list) and all(isinstance(name, str) for name in remove),
+               f"{where}.remove must be a list of employee names")
+        extra = scenario.get("extra_days_off", {})
+        _check(isinstance(extra, dict), f"{where}.extra_days_off must be an object")
+        for name, days in extra.items():
+            _check_days(days, f"{where}.extra_days_off[{name!r}]")
+        add = scenario.get("add", [])
+        _check(isinstance(add, list), f"{where}.add must be a list")
+        for j, spec in enumerate(add):
+            spec_where = f"{where}.add[{j}]"
+            _check(isinstance(spec, dict), f"{spec_where} must be an object")
+            _check(isinstance(spec.get("name", ""), str), f"{spec_where}.name must be a string")
+            _check(spec.get("shift_type", "8-hour") in SHIFT_TYPES,
+                   f"{spec_where}.shift_type must be one of {', '.join(SHIFT_TYPES)}")
+            for key in ("preferred_day_off", "manual_days_off"):
+                if key in spec:
+                    _check_days(spec[key], f"{spec_where}.{key}")
+            requests = spec.get("shift_requests", {})
+            _check(isinstance(requests, dict)
+                   and all(day in WEEK_DAYS and shift in SHIFT_REQUESTS for day, shift in requests.items()),
+                   f"{spec_where}.shift_requests must map day names to Morning or Evening")
+        min_staff = scenario.get("min_staff", {})
+        _check(isinstance(min_staff, dict), f"{where}.min_staff must be an object")
+        for day, staff in min_staff.items():
+            _check(day in WEEK_DAYS, f"{where}.min_staff: unknown day {day!r}")
+            _check(isinstance(staff, dict)
+                   and all(kind in SHIFT_KINDS and _is_int(n) and n >= 0 for kind, n in staff.items()),
+                   f"{where}.min_staff[{day!r}] must map morning/evening to non-negative integers")
+        slots = scenario.get("min_staff_slots", {})
+        _check(isinstance(slots, dict), f"{where}.min_staff_slots must be an object")
+        for day, rules in slots.items():
+            rules_where = f"{where}.min_staff_slots[{day!r}]"
+            _check(day in WEEK_DAYS, f"{where}.min_staff_slots: unknown day {day!r}")
+            _check(isinstance(rules, list), f"{rules_where} must be a list of [start, end, staff]")
+            for rule in rules:
+                _check(isinstance(rule, (list, tuple)) and len(rule) == 3,
+                       f"{rules_where} must be a list of [start, end, staff]")
+                _check_hhmm(rule[0], rules_where)
+                _check_hhmm(rule[1], rules_where)
+                _check(_is_int(rule[2]) and rule[2] >= 0, f"{rules_where}: staff must be a non-negative integer")
+    return scenarios
+
+
+def bounded_int(value, name, minimum, cap):
+    # Integers below `minimum` are rejected; values above `cap` are clamped to it.
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if isinstance(value, float) and value != number:
+        raise ValueError(f"{name} must be an integer")
+    if number < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return min(number, cap) if cap is not None else number
+
+
+def apply_scenario(base_config, employees, scenario):
+    config = dict(base_config)
+    if "week_working_days" in scenario:
+        config["WEEK_WORKING_DAYS"] = int(scenario["week_working_days"])
+    if "min_staff" in scenario:
+        min_staff_day = {day: dict(v) for day, v in config.get("MIN_STAFF_PER_SHIFT_DAY", {}).items()}
+        for day, staff in scenario["min_staff"].items():
+            min_staff_day.setdefault(day, {}).update(staff)
+        config["MIN_STAFF_PER_SHIFT_DAY"] = min_staff_day
+    if "min_staff_slots" in scenario:
+        slot_rules = dict(config.get("MIN_STAFF_PER_SLOT_DAY", {}))
+        slot_rules.update({day: [tuple(rule) for rule in rules] for day, rules in scenario["min_staff_slots"].items()})
+        config["MIN_STAFF_PER_SLOT_DAY"] = slot_rules
+
+    removed = set(scenario.get("remove", []))
+    extra_days_off = scenario.get("extra_days_off", {})
+    staff = []
+    for emp in employees:
+        if emp.name in removed:
+            continue
+        extra = extra_days_off.get(emp.name)
+        staff.append(emp.replace(manual_days_off=emp.manual_days_off | set(extra)) if extra else emp)
+    for i, spec in enumerate(scenario.get("add", [])):
+        staff.append(EmployeeRecord(
+            None,
+            spec.get("name", f"Hypothetical {spec.get('shift_type', '8-hour')} #{i + 1}"),
+            spec.get("shift_type", "8-hour"),
+            spec.get("preferred_day_off"),
+            spec.get("manual_days_off"),
+            spec.get("shift_requests"),
+        ))
+    return config, staff
+
+
+def with_headcount(employees, shift_type, count):
+    # Keep the first `count` employees of a contract type (by name) and pad with
+    # unconstrained hypothetical hires when more are needed.
+    others = [emp for emp in employees if emp.shift_type != shift_type]
+    same = sorted((emp for emp in employees if emp.shift_type == shift_type), key=lambda emp: emp.name)
+    same = same[:count]
+    for i in range(len(same), count):
+        same.append(EmployeeRecord(None, f"Hypothetical {shift_type} #{i + 1}", shift_type))
+    return others + same
+
+
+def evaluate_workforce(config, employees, trials, seed):
+    # Runs in worker processes: pure function of its (picklable) arguments.
+    scheduler = Scheduler(config)
+    rng_state = random.getstate()
+    schedules = []
+    for trial in range(max(1, trials)):
+        random.seed(seed + trial)
+        schedules.append(scheduler.generate_schedule(employees))
+    random.setstate(rng_state)
+
+    result = evaluate_schedules(schedules, employees, scheduler, config)
+    best = int(result["score"].argmin())
+    shortage = result["shortage"][best]
+    slot_shortage = int(result["slot_shortage"][best].sum())
+    slot_surplus = int(result["slot_surplus"][best].sum())
+    headcount = {shift_type: sum(1 for emp in employees if emp.shift_type == shift_type) for shift_type in SHIFT_TYPES}
+    return {
+        "feasible": bool(shortage.sum() == 0 and slot_shortage == 0),
+        "shortage": {
+            day: {kind: int(shortage[d, k]) for k, kind in enumerate(SHIFT_KINDS)}
+            for d, day in enumerate(scheduler.week_days)
+            if shortage[d].any()
+        },
+        "total_shortage": int(shortage.sum()),
+        "slot_shortage": slot_shortage,
+        "slot_surplus": slot_surplus,
+        "score": int(result["score"][best]),
+        "headcount": headcount,
+    }
+
+
+def _evaluate_task(task):
+    return evaluate_workforce(*task)
+
+
+def _headcount_probe(state):
+    # Next count to try for one (scenario, contract type) search, or None when done.
+    # lo is known infeasible (-1 = none yet), hi known feasible (None = none yet).
+    if state["hi"] is None:
+        return state["upper"] if state["lo"] < state["upper"] else None
+    if state["hi"] - state["lo"] <= 1:
+        return None
+    return (state["lo"] + state["hi"]) // 2
+
+
+def headcount_evaluations(current, max_extra_headcount):
+    # Worst-case evaluations of one headcount search: the upper bound, then bisection.
+    return 1 + max(1, current + max_extra_headcount + 1).bit_length()
+
+
+def estimated_schedules(employees, scenarios, trials, headcount_search=True, max_extra_headcount=5):
+    # Upper bound on the schedules a run_simulation call generates, for request budgets.
+    evaluations = 0
+    for scenario in scenarios or [{}]:
+        evaluations += 1
+        if headcount_search:
+            staff = len(employees) + len(scenario.get("add", []))
+            evaluations += len(SHIFT_TYPES) * headcount_evaluations(staff, max_extra_headcount)
+    return evaluations * max(1, trials)
+
+
+def run_simulation(base_config, employees, scenarios, trials=8, workers=None, headcount_search=True,
+                   max_extra_headcount=5, seed=0):
+    scenarios = scenarios or [{"name": "current"}]
+    prepared = [apply_scenario(base_config, employees, scenario) for scenario in scenarios]
+    pool = None if workers is not None and workers <= 1 else ProcessPoolExecutor(max_workers=workers)
+
+    def evaluate(tasks):
+        if pool is None:
+            return [_evaluate_task(task) for task in tasks]
+        return list(pool.map(_evaluate_task, tasks, chunksize=max(1, len(tasks) // 32)))
+
+    try:
+        outcomes = evaluate([(config, staff, trials, seed) for config, staff in prepared])
+        results = [dict(name=scenario.get("name", f"scenario {i + 1}"), scenario=scenario, **outcome)
+                   for i, (scenario, outcome) in enumerate(zip(scenarios, outcomes))]
+        if not headcount_search:
+            return results
+
+        # Minimum headcount per contract type, holding the other type at its scenario
+        # level. The search starts from the scenario's own headcount, whose outcome is
+        # already known, and bisects towards the smallest feasible count, assuming
+        # more staff never makes a schedule less feasible.
+        searches = []
+        for index, (_, staff) in enumerate(prepared):
+            for shift_type in SHIFT_TYPES:
+                current = sum(1 for emp in staff if emp.shift_type == shift_type)
+                feasible = results[index]["feasible"]
+                searches.append({
+                    "index": index, "shift_type": shift_type, "upper": current + max_extra_headcount,
+                    "lo": -1 if feasible else current, "hi": current if feasible else None,
+                })
+        while True:
+            probes = [(search, _headcount_probe(search)) for search in searches]
+            probes = [(search, count) for search, count in probes if count is not None]
+            if not probes:
+                break
+            tasks = []
+            for search, count in probes:
+                config, staff = prepared[search["index"]]
+                tasks.append((config, with_headcount(staff, search["shift_type"], count), trials, seed))
+            outcomes = evaluate(tasks)
+            for (search, count), outcome in zip(probes, outcomes):
+                if outcome["feasible"]:
+                    search["hi"] = count
+                else:
+                    search["lo"] = count
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for result in results:
+        result["min_headcount"] = {}
+    for search in searches:
+        results[search["index"]]["min_headcount"][search["shift_type"]] = search["hi"]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate what-if staffing scenarios without touching the database.")
+    parser.add_argument("scenarios", nargs="?", help="JSON file with a list of scenarios (default: current staffing)")
+    parser.add_argument("--trials", type=int, default=8, help="randomized schedules per scenario")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (1 = in-process)")
+    parser.add_argument("--max-extra", type=int, default=5, help="extra hires tried per contract type")
+    parser.add_argument("--no-headcount", action="store_true", help="skip the minimum headcount search")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    scenarios = None
+    if args.scenarios:
+        with open(args.scenarios, encoding="utf-8") as f:
+            scenarios = json.load(f)
+        try:
+            validate_scenarios(scenarios)
+        except ValueError as exc:
+            parser.error(f"{args.scenarios}: {exc}")
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from create_app import app
+    from models import db
+
+    with app.app_context():
+        employees = load_employee_records()
+        base_config = config_snapshot(app.config)
+        db.session.remove()
+
+    results = run_simulation(base_config, employees, scenarios, trials=args.trials, workers=args.workers,
+                             headcount_search=not args.no_headcount, max_extra_headcount=args.max_extra)
+    for result in results:
+        status = "feasible" if result["feasible"] else f"short {result['total_shortage']} (slots {result['slot_shortage']})"
+        line = f"{result['name']}: {status}"
+        if "min_headcount" in result:
+            line += f" | min headcount {result['min_headcount']}"
+        print(line)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
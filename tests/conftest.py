@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# The config reads DATABASE_URL at import time: use an in-memory database.
+os.environ["DATABASE_URL"] = "sqlite://"
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from create_app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from create_app import create_app
+from models import db, Employee
+from versions import save_schedule_version
+
+
+def add_employee(name):
+    employee = Employee(name=name, shift_type="6-hour")
+    db.session.add(employee)
+    db.session.commit()
+    return employee
+
+
+def store_week(shifts):
+    # shifts: [(employee, "Morning" | "Evening" | None)] for Monday
+    schedule = {"Monday": [
+        {"employee": emp.name, "employee_id": emp.id,
+         "shift": f"{kind} (09:00–15:00)" if kind else "Assigned Day Off", "shift_type": "6-hour"}
+        for emp, kind in shifts
+    ]}
+    return save_schedule_version(schedule, when=datetime.now())
+
+
+def feed(client, employee_id):
+    response = client.get(f"/schedule/calendar/{employee_id}.ics")
+    assert response.status_code == 200
+    return response
+
+
+def test_each_app_indexes_its_own_database(app, client):
+    employees = [add_employee(f"E{i}") for i in range(3)]
+    for _ in range(3):
+        store_week([(emp, "Morning") for emp in employees])
+    assert feed(client, 2).data.count(b"BEGIN:VEVENT") == 1
+
+    other = create_app()
+    with other.app_context():
+        db.create_all()
+        first, second = add_employee("Other 1"), add_employee("Other 2")
+        store_week([(first, None), (second, "Evening")])
+        response = feed(other.test_client(), 2)
+        assert response.data.count(b"BEGIN:VEVENT") == 1
+        assert not response.headers["ETag"].startswith('"2-0-')
+        db.drop_all()
+
+
+def test_index_is_rebuilt_when_the_database_is_reset(app, client):
+    employees = [add_employee(f"E{i}") for i in range(2)]
+    store_week([(employees[0], "Morning"), (employees[1], "Morning")])
+    store_week([(employees[0], "Morning"), (employees[1], None)])
+    assert feed(client, 2).data.count(b"BEGIN:VEVENT") == 0
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    employees = [add_employee(f"E{i}") for i in range(2)]
+    store_week([(employees[0], None), (employees[1], "Evening")])
+    store_week([(employees[0], None), (employees[1], "Evening")])
+    assert b"Evening" in feed(client, 2).data
+
+
+def test_feeds_follow_employee_ids_not_names(app, client):
+    first, second = add_employee("Anna"), add_employee("Anna")
+    store_week([(first, "Morning"), (second, "Evening")])
+    assert b"Morning" in feed(client, first.id).data
+    assert b"Evening" not in feed(client, first.id).data
+    assert b"Evening" in feed(client, second.id).data
+
+    before = feed(client, first.id)
+    first.name = "Anna Maria"
+    db.session.commit()
+    after = feed(client, first.id)
+    assert b"Morning" in after.data
+    assert b"Anna Maria shifts" in after.data
+    assert after.headers["ETag"] != before.headers["ETag"]
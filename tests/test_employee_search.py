@@ -0,0 +1,41 @@
+from models import db, Employee
+from employees.routes import prefix_upper_bound
+
+
+def add_employees(*names):
+    for name in names:
+        db.session.add(Employee(name=name, shift_type="6-hour"))
+    db.session.commit()
+
+
+def search(client, q):
+    response = client.get("/employees/search", query_string={"q": q})
+    assert response.status_code == 200
+    return sorted(item["name"] for item in response.get_json()["employees"])
+
+
+def test_name_prefix_is_case_insensitive(app, client):
+    add_employees("Anna", "anne", "ANDREAS", "Bob", "Ánna")
+    assert search(client, "ann") == ["Anna", "anne"]
+    assert search(client, "AN") == ["ANDREAS", "Anna", "anne"]
+    assert search(client, "án") == ["Ánna"]
+
+
+def test_name_key_follows_renames(app, client):
+    add_employees("Anna")
+    employee = Employee.query.one()
+    employee.name = "Zoe"
+    db.session.commit()
+    assert search(client, "ann") == []
+    assert search(client, "z") == ["Zoe"]
+
+
+def test_prefix_matches_characters_above_the_bmp(app, client):
+    add_employees("a\U0001F600b", "ab")
+    assert search(client, "a") == ["ab", "a\U0001F600b"]
+
+
+def test_prefix_upper_bound():
+    assert prefix_upper_bound("ab") == "ac"
+    assert prefix_upper_bound("a\U0010FFFF") == "b"
+    assert prefix_upper_bound("\U0010FFFF") is None
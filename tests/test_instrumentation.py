@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db
+
+
+def test_failed_statements_leave_no_state_on_the_connection(app):
+    with db.engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+        assert "query_start" not in conn.info
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_requests_report_query_counts(app, client):
+    response = client.get("/employees/search")
+    assert response.status_code == 200
+    assert int(response.headers["X-SQL-Queries"]) >= 1
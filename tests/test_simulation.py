@@ -0,0 +1,48 @@
+from models import db, Employee
+from records import EmployeeRecord
+from simulation import SHIFT_TYPES, evaluate_workforce, run_simulation, with_headcount
+
+CONFIG = {
+    "WEEK_WORKING_DAYS": 6,
+    "MIN_STAFF_PER_SHIFT": 0,
+    "MIN_STAFF_PER_SHIFT_DAY": {"Saturday": {"morning": 2, "evening": 2}},
+    "MIN_STAFF_PER_SLOT_DAY": {},
+}
+
+
+def staff(eight_hour, six_hour):
+    employees = [EmployeeRecord(i, f"E{i:02d}", "8-hour") for i in range(eight_hour)]
+    employees += [EmployeeRecord(100 + i, f"S{i:02d}", "6-hour") for i in range(six_hour)]
+    return employees
+
+
+def linear_min_headcount(employees, shift_type, max_extra, trials):
+    current = sum(1 for emp in employees if emp.shift_type == shift_type)
+    for count in range(current + max_extra + 1):
+        if evaluate_workforce(CONFIG, with_headcount(employees, shift_type, count), trials, 0)["feasible"]:
+            return count
+    return None
+
+
+def test_headcount_search_matches_a_linear_sweep():
+    for employees in (staff(1, 1), staff(3, 2), staff(6, 4)):
+        result = run_simulation(CONFIG, employees, None, trials=2, workers=1, max_extra_headcount=4)[0]
+        for shift_type in SHIFT_TYPES:
+            assert result["min_headcount"][shift_type] == linear_min_headcount(employees, shift_type, 4, 2)
+
+
+def test_simulate_rejects_non_boolean_headcount_search(app, client):
+    response = client.post("/schedule/simulate", json={"headcount_search": "false"})
+    assert response.status_code == 400
+
+
+def test_simulate_rejects_requests_over_the_schedule_budget(app, client):
+    for i in range(20):
+        db.session.add(Employee(name=f"E{i:02d}", shift_type="8-hour" if i % 2 else "6-hour"))
+    db.session.commit()
+    app.config["SIMULATION_MAX_SCHEDULES"] = 100
+    large = client.post("/schedule/simulate", json={"trials": 32, "scenarios": [{}, {}]})
+    assert large.status_code == 400
+    small = client.post("/schedule/simulate", json={"trials": 1, "headcount_search": False})
+    assert small.status_code == 200
+    assert "min_headcount" not in small.get_json()["scenarios"][0]
@@ -0,0 +1,49 @@
+from records import EmployeeRecord
+from scheduler import Scheduler
+from schedule_metrics import evaluate_schedules, max_staff_slot_grid, min_staff_slot_grid, NO_SLOT_CAP
+from shifts import SLOT_LABELS, shift_label
+
+CONFIG = {
+    "WEEK_WORKING_DAYS": 7,
+    "MIN_STAFF_PER_SHIFT": 0,
+    "MIN_STAFF_PER_SLOT_DAY": {},
+    "MAX_STAFF_PER_SLOT_DAY": {},
+}
+
+
+def entry(name, shift_type, is_morning):
+    return {"employee": name, "shift": shift_label(shift_type, is_morning), "shift_type": shift_type}
+
+
+def test_slot_caps_default_to_uncapped():
+    grid = max_staff_slot_grid({}, ["Monday"])
+    assert (grid == NO_SLOT_CAP).all()
+    assert (min_staff_slot_grid({}, ["Monday"]) == 0).all()
+
+
+def overlap_schedule(second_is_morning):
+    # Two 8-hour employees always cover the overlap; the 6-hour ones cover
+    # 13:30-15:00 in the morning and 15:00-16:30 in the evening.
+    return {"Monday": [entry("E0", "8-hour", True), entry("E1", "8-hour", False),
+                       entry("E2", "6-hour", True), entry("E3", "6-hour", second_is_morning)]}
+
+
+EMPLOYEES = [EmployeeRecord(0, "E0", "8-hour"), EmployeeRecord(1, "E1", "8-hour"),
+             EmployeeRecord(2, "E2", "6-hour"), EmployeeRecord(3, "E3", "6-hour")]
+CAPPED = dict(CONFIG, MAX_STAFF_PER_SLOT_DAY={"Monday": [("13:30", "16:30", 3)]})
+
+
+def test_overlap_surplus_counts_against_the_score():
+    scheduler = Scheduler(CAPPED)
+    result = evaluate_schedules([overlap_schedule(True), overlap_schedule(False)], EMPLOYEES, scheduler, CAPPED)
+    assert result["slot_surplus"][0].sum() == SLOT_LABELS.index("15:00") - SLOT_LABELS.index("13:30")
+    assert result["slot_surplus"][1].sum() == 0
+    assert result["score"][0] > result["score"][1]
+
+
+def test_enforce_slot_coverage_flips_out_of_an_overstaffed_overlap():
+    scheduler = Scheduler(CAPPED)
+    schedule = overlap_schedule(True)
+    assert scheduler.day_slot_surplus("Monday", schedule["Monday"]).sum() > 0
+    scheduler.enforce_slot_coverage("Monday", schedule)
+    assert scheduler.day_slot_surplus("Monday", schedule["Monday"]).sum() == 0
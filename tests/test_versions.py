@@ -0,0 +1,101 @@
+import copy
+from datetime import datetime
+
+from models import db, PreviousSchedule
+from versions import apply_delta, cell_changes, diff_schedules, load_schedule, save_schedule_version
+
+
+def make_schedule():
+    return {
+        "Monday": [
+            {"employee": "Anna", "shift": "Morning (08:30–16:30)", "shift_type": "8-hour"},
+            {"employee": "Ben", "shift": "Evening (15:00–21:00)", "shift_type": "6-hour"},
+            {"employee": "Cleo", "shift": "Assigned Day Off", "source": "dynamic"},
+        ],
+        "Tuesday": [
+            {"employee": "Anna", "shift": "Evening (13:30–21:30)", "shift_type": "8-hour"},
+            {"employee": "Ben", "shift": "Assigned Day Off", "source": "preferred"},
+            {"employee": "Cleo", "shift": "Morning (09:00–15:00)", "shift_type": "6-hour"},
+        ],
+        "Sunday": [
+            {"employee": "Anna", "shift": "Store Closed"},
+            {"employee": "Ben", "shift": "Store Closed"},
+            {"employee": "Cleo", "shift": "Store Closed"},
+        ],
+    }
+
+
+def cells(schedule):
+    return {(e["employee"], day): e for day, entries in schedule.items() for e in entries}
+
+
+def test_delta_round_trip():
+    base = make_schedule()
+    new = copy.deepcopy(base)
+    new["Monday"][0] = {"employee": "Anna", "shift": "Evening (13:30–21:30)", "shift_type": "8-hour",
+                        "source": "flipped_dynamic"}
+    del new["Tuesday"][1]
+    new["Tuesday"].append({"employee": "Dora", "shift": "Morning (09:00–15:00)", "shift_type": "6-hour"})
+
+    changes = cell_changes(base, new)
+    assert cells(apply_delta(base, changes)) == cells(new)
+    assert set(changes) == {"Monday", "Tuesday"}
+    assert changes["Tuesday"] == {"Ben": None, "Dora": new["Tuesday"][-1]}
+
+
+def test_identical_schedules_have_no_changes():
+    base = make_schedule()
+    assert cell_changes(base, copy.deepcopy(base)) == {}
+    assert cells(apply_delta(base, {})) == cells(base)
+    assert diff_schedules(base, copy.deepcopy(base)) == []
+
+
+def test_later_versions_in_a_week_are_stored_as_deltas(app):
+    base = make_schedule()
+    new = copy.deepcopy(base)
+    new["Monday"][1]["shift"] = "Morning (09:00–15:00)"
+
+    first = save_schedule_version(base, when=datetime(2026, 10, 19, 9))
+    second = save_schedule_version(new, when=datetime(2026, 10, 20, 9))
+
+    assert first.base_id is None
+    assert second.base_id == first.id
+    assert second.data == {"changes": {"Monday": {"Ben": new["Monday"][1]}}}
+    assert cells(load_schedule(second.id)) == cells(new)
+
+
+def test_load_schedule_does_not_cache_misses(app):
+    assert load_schedule(1) is None
+    db.session.add(PreviousSchedule(date=datetime(2026, 10, 19), data=make_schedule()))
+    db.session.commit()
+    assert cells(load_schedule(1)) == cells(make_schedule())
+
+
+def test_load_schedule_returns_independent_copies(app):
+    record = save_schedule_version(make_schedule(), when=datetime(2026, 10, 19, 9))
+    loaded = load_schedule(record.id)
+    loaded["Monday"][0]["shift"] = "changed"
+    loaded["Tuesday"].clear()
+    assert cells(load_schedule(record.id)) == cells(make_schedule())
+
+
+def test_version_list_limit_is_clamped(app, client):
+    for day in (19, 20, 21):
+        save_schedule_version(make_schedule(), when=datetime(2026, 10, day, 9))
+    for limit, expected in (("-1", 1), ("0", 1), ("2", 2), ("1000", 3)):
+        response = client.get("/schedule/versions", query_string={"limit": limit})
+        assert response.status_code == 200
+        assert len(response.get_json()["versions"]) == expected
+
+
+def test_employees_sharing_a_name_stay_apart():
+    base = {"Monday": [
+        {"employee": "Anna", "employee_id": 1, "shift": "Morning (09:00–15:00)", "shift_type": "6-hour"},
+        {"employee": "Anna", "employee_id": 2, "shift": "Evening (15:00–21:00)", "shift_type": "6-hour"},
+    ]}
+    new = copy.deepcopy(base)
+    new["Monday"][1]["shift"] = "Morning (09:00–15:00)"
+    changes = cell_changes(base, new)
+    assert changes == {"Monday": {"#2": new["Monday"][1]}}
+    assert apply_delta(base, changes)["Monday"] == new["Monday"]
+    assert [(c["employee_id"], c["after"]) for c in diff_schedules(base, new)] == [(2, "Morning (09:00–15:00)")]
@@ -0,0 +1,162 @@
+# versions.py
+
+import copy
+import threading
+from collections import OrderedDict
+from datetime import datetime, time
+from flask import current_app
+from models import db, PreviousSchedule
+from fairness import week_start_for
+from shifts import WEEK_DAYS
+
+VERSION_CACHE_SIZE = 256
+
+# The first schedule saved in a week is stored in full (the weekly base); later
+# versions in the same week store only the cells that differ from that base:
+#   {"changes": {day: {cell key: entry or None}}}
+# where None means the employee has no entry for that day anymore. Cells are keyed
+# by employee id ("#<id>") when the entry carries one, so employees sharing a name
+# stay apart; entries saved before ids were recorded are keyed by name.
+
+
+def cell_key(entry):
+    employee_id = entry.get("employee_id")
+    return f"#{employee_id}" if employee_id is not None else entry["employee"]
+
+
+def schedule_cells(schedule):
+    return {
+        (cell_key(entry), day): entry
+        for day in WEEK_DAYS
+        for entry in schedule.get(day, [])
+    }
+
+
+def cell_changes(old, new, candidates=None):
+    old_cells, new_cells = schedule_cells(old), schedule_cells(new)
+    if candidates is None:
+        candidates = old_cells.keys() | new_cells.keys()
+    changes = {}
+    for key, day in candidates:
+        before, after = old_cells.get((key, day)), new_cells.get((key, day))
+        if before != after:
+            changes.setdefault(day, {})[key] = after
+    return changes
+
+
+def apply_delta(base, changes):
+    schedule = {}
+    for day in WEEK_DAYS:
+        day_changes = changes.get(day, {})
+        entries = []
+        for entry in base.get(day, []):
+            key = cell_key(entry)
+            if key in day_changes:
+                replacement = day_changes[key]
+                if replacement is not None:
+                    entries.append(replacement)
+            else:
+                entries.append(entry)
+        present = {cell_key(entry) for entry in base.get(day, [])}
+        entries.extend(e for key, e in day_changes.items() if e is not None and key not in present)
+        schedule[day] = entries
+    return schedule
+
+
+def diff_schedules(old, new, candidates=None):
+    old_cells, new_cells = schedule_cells(old), schedule_cells(new)
+    diff = []
+    for day, keys in cell_changes(old, new, candidates).items():
+        for key in keys:
+            before, after = old_cells.get((key, day)), new_cells.get((key, day))
+            diff.append({
+                "employee": (after or before)["employee"],
+                "employee_id": (after or before).get("employee_id"),
+                "day": day,
+                "before": before["shift"] if before else None,
+                "after": after["shift"] if after else None,
+                "before_source": before.get("source") if before else None,
+                "after_source": after.get("source") if after else None,
+            })
+    day_order = {day: i for i, day in enumerate(WEEK_DAYS)}
+    diff.sort(key=lambda change: (change["employee"], day_order[change["day"]]))
+    return diff
+
+
+def _version_cache():
+    # Reconstructions are cached per app (and so per engine) in app.extensions,
+    # never process-wide: the load test and tests swap in scratch databases.
+    cache = current_app.extensions.get("schedule_versions")
+    if cache is None:
+        cache = current_app.extensions.setdefault("schedule_versions", {"lock": threading.Lock(), "entries": OrderedDict()})
+    return cache
+
+
+def _reconstruct(version_id):
+    record = db.session.get(PreviousSchedule, version_id)
+    if record is None:
+        return None  # misses are not cached: the row may be written later
+    # Versions are immutable once written. The key includes the version date so an
+    # id that SQLite reuses after a delete is not served from the old entry.
+    key = (version_id, record.date)
+    cache = _version_cache()
+    with cache["lock"]:
+        schedule = cache["entries"].get(key)
+        if schedule is not None:
+            cache["entries"].move_to_end(key)
+            return schedule
+    if record.base_id is None:
+        schedule = copy.deepcopy(record.data)
+    else:
+        base = _reconstruct(record.base_id)
+        if base is None:
+            return None
+        schedule = apply_delta(base, record.data.get("changes", {}))
+    with cache["lock"]:
+        cache["entries"][key] = schedule
+        while len(cache["entries"]) > VERSION_CACHE_SIZE:
+            cache["entries"].popitem(last=False)
+    return schedule
+
+
+def load_schedule(version_id):
+    # Callers get their own copy; the cached reconstruction is never handed out.
+    schedule = _reconstruct(version_id)
+    return copy.deepcopy(schedule) if schedule is not None else None
+
+
+def changed_cells(record):
+    if record.base_id is None:
+        return None
+    return {(key, day) for day, keys in record.data.get("changes", {}).items() for key in keys}
+
+
+def diff_versions(old_record, new_record):
+    old, new = _reconstruct(old_record.id), _reconstruct(new_record.id)
+    # Two versions over the same weekly base can only differ where either one
+    # differs from the base, so only those cells need comparing.
+    candidates = None
+    old_base = old_record.base_id or old_record.id
+    new_base = new_record.base_id or new_record.id
+    if old_base == new_base:
+        candidates = (changed_cells(old_record) or set()) | (changed_cells(new_record) or set())
+    return diff_schedules(old, new, candidates)
+
+
+def save_schedule_version(schedule, when=None):
+    when = when or datetime.utcnow()
+    week_start = datetime.combine(week_start_for(when.date()), time.min)
+    base = (
+        PreviousSchedule.query
+        .filter(PreviousSchedule.base_id.is_(None), PreviousSchedule.date >= week_start, PreviousSchedule.date <= when)
+        .order_by(PreviousSchedule.date.desc())
+        .first()
+    )
+    if base is None:
+        record = PreviousSchedule(date=when, data=schedule)
+    else:
+        record = PreviousSchedule(date=when, base_id=base.id,
+                                  data={"changes": cell_changes(_reconstruct(base.id), schedule)})
+    db.session.add(record)
+    db.session.commit()
+    return record
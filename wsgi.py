@@ -1,3 +1,9 @@
+import os
+
+# gunicorn (see Procfile) serves the app through this module: use the production
+# profile unless APP_CONFIG says otherwise.
+os.environ.setdefault("APP_CONFIG", "production")
+
 from create_app import app  # or from my_project.create_app import app
 
 if __name__ == "__main__":